@@ -5,7 +5,92 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://techofer.github.io',
                 'git_url': 'https://github.com/techofer/02360018_final_project',
                 'lib_path': 'electricity_market'},
-  'syms': { 'electricity_market.env': { 'electricity_market.env.ElectricityMarketEnv': ( 'env.html#electricitymarketenv',
+  'syms': { 'electricity_market.battery_dynamics': { 'electricity_market.battery_dynamics.BatteryDynamics': ( 'battery_dynamics.html#batterydynamics',
+                                                                                                              'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.__init__': ( 'battery_dynamics.html#batterydynamics.__init__',
+                                                                                                                       'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.action_masks': ( 'battery_dynamics.html#batterydynamics.action_masks',
+                                                                                                                           'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.charge_amounts': ( 'battery_dynamics.html#batterydynamics.charge_amounts',
+                                                                                                                             'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.is_done': ( 'battery_dynamics.html#batterydynamics.is_done',
+                                                                                                                      'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.is_safe_range_violation': ( 'battery_dynamics.html#batterydynamics.is_safe_range_violation',
+                                                                                                                                      'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.observations': ( 'battery_dynamics.html#batterydynamics.observations',
+                                                                                                                           'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.safe_range': ( 'battery_dynamics.html#batterydynamics.safe_range',
+                                                                                                                         'electricity_market/battery_dynamics.py'),
+                                                     'electricity_market.battery_dynamics.BatteryDynamics.step': ( 'battery_dynamics.html#batterydynamics.step',
+                                                                                                                   'electricity_market/battery_dynamics.py')},
+            'electricity_market.benchmark': { 'electricity_market.benchmark._best_rate': ( 'benchmark.html#_best_rate',
+                                                                                           'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark._git_commit': ( 'benchmark.html#_git_commit',
+                                                                                            'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark._latency_result': ( 'benchmark.html#_latency_result',
+                                                                                                'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark._metadata': ( 'benchmark.html#_metadata',
+                                                                                          'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark._package_version': ( 'benchmark.html#_package_version',
+                                                                                                 'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark._parse_args': ( 'benchmark.html#_parse_args',
+                                                                                            'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark._rate_result': ( 'benchmark.html#_rate_result',
+                                                                                             'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark.benchmark_agents': ( 'benchmark.html#benchmark_agents',
+                                                                                                 'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark.benchmark_env': ( 'benchmark.html#benchmark_env',
+                                                                                              'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark.benchmark_training': ( 'benchmark.html#benchmark_training',
+                                                                                                   'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark.compare_results': ( 'benchmark.html#compare_results',
+                                                                                                'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark.main': ( 'benchmark.html#main',
+                                                                                     'electricity_market/benchmark.py'),
+                                              'electricity_market.benchmark.run_benchmarks': ( 'benchmark.html#run_benchmarks',
+                                                                                               'electricity_market/benchmark.py')},
+            'electricity_market.dynamic_programming': { 'electricity_market.dynamic_programming.BatteryDP': ( 'dynamic_programming.html#batterydp',
+                                                                                                              'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.__init__': ( 'dynamic_programming.html#batterydp.__init__',
+                                                                                                                       'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP._backup': ( 'dynamic_programming.html#batterydp._backup',
+                                                                                                                      'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP._interpolate': ( 'dynamic_programming.html#batterydp._interpolate',
+                                                                                                                           'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP._shift': ( 'dynamic_programming.html#batterydp._shift',
+                                                                                                                     'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.action_values': ( 'dynamic_programming.html#batterydp.action_values',
+                                                                                                                            'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.is_solved': ( 'dynamic_programming.html#batterydp.is_solved',
+                                                                                                                        'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.load': ( 'dynamic_programming.html#batterydp.load',
+                                                                                                                   'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.save': ( 'dynamic_programming.html#batterydp.save',
+                                                                                                                   'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.solve': ( 'dynamic_programming.html#batterydp.solve',
+                                                                                                                    'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.BatteryDP.values': ( 'dynamic_programming.html#batterydp.values',
+                                                                                                                     'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming._perfect_foresight': ( 'dynamic_programming.html#_perfect_foresight',
+                                                                                                                       'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming._suffix_argmax': ( 'dynamic_programming.html#_suffix_argmax',
+                                                                                                                   'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.perfect_foresight_actions': ( 'dynamic_programming.html#perfect_foresight_actions',
+                                                                                                                              'electricity_market/dynamic_programming.py'),
+                                                        'electricity_market.dynamic_programming.perfect_foresight_rewards': ( 'dynamic_programming.html#perfect_foresight_rewards',
+                                                                                                                              'electricity_market/dynamic_programming.py')},
+            'electricity_market.env': { 'electricity_market.env.Calendar': ('env.html#calendar', 'electricity_market/env.py'),
+                                        'electricity_market.env.Calendar.draw_demand': ( 'env.html#calendar.draw_demand',
+                                                                                         'electricity_market/env.py'),
+                                        'electricity_market.env.Calendar.draw_sell_price': ( 'env.html#calendar.draw_sell_price',
+                                                                                             'electricity_market/env.py'),
+                                        'electricity_market.env.Calendar.draw_weather': ( 'env.html#calendar.draw_weather',
+                                                                                          'electricity_market/env.py'),
+                                        'electricity_market.env.Calendar.production': ( 'env.html#calendar.production',
+                                                                                        'electricity_market/env.py'),
+                                        'electricity_market.env.Calendar.timestep_of_year': ( 'env.html#calendar.timestep_of_year',
+                                                                                              'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv': ( 'env.html#electricitymarketenv',
                                                                                          'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv.__init__': ( 'env.html#electricitymarketenv.__init__',
                                                                                                   'electricity_market/env.py'),
@@ -13,18 +98,14 @@ d = { 'settings': { 'branch': 'main',
                                                                                                              'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._charge_amount': ( 'env.html#electricitymarketenv._charge_amount',
                                                                                                         'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv._charge_amounts': ( 'env.html#electricitymarketenv._charge_amounts',
+                                                                                                         'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._demand_of_electricity': ( 'env.html#electricitymarketenv._demand_of_electricity',
                                                                                                                 'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._electricity_leftover': ( 'env.html#electricitymarketenv._electricity_leftover',
                                                                                                                'electricity_market/env.py'),
-                                        'electricity_market.env.ElectricityMarketEnv._get_demand_of_electricity': ( 'env.html#electricitymarketenv._get_demand_of_electricity',
-                                                                                                                    'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._get_obs': ( 'env.html#electricitymarketenv._get_obs',
                                                                                                   'electricity_market/env.py'),
-                                        'electricity_market.env.ElectricityMarketEnv._get_sell_price': ( 'env.html#electricitymarketenv._get_sell_price',
-                                                                                                         'electricity_market/env.py'),
-                                        'electricity_market.env.ElectricityMarketEnv._get_weather': ( 'env.html#electricitymarketenv._get_weather',
-                                                                                                      'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._is_action_valid': ( 'env.html#electricitymarketenv._is_action_valid',
                                                                                                           'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._is_dark_hours': ( 'env.html#electricitymarketenv._is_dark_hours',
@@ -33,45 +114,197 @@ d = { 'settings': { 'branch': 'main',
                                                                                                   'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._is_safe_range_violation': ( 'env.html#electricitymarketenv._is_safe_range_violation',
                                                                                                                   'electricity_market/env.py'),
-                                        'electricity_market.env.ElectricityMarketEnv._max_demand_of_electricity': ( 'env.html#electricitymarketenv._max_demand_of_electricity',
-                                                                                                                    'electricity_market/env.py'),
-                                        'electricity_market.env.ElectricityMarketEnv._max_price': ( 'env.html#electricitymarketenv._max_price',
-                                                                                                    'electricity_market/env.py'),
-                                        'electricity_market.env.ElectricityMarketEnv._min_electricity_demand': ( 'env.html#electricitymarketenv._min_electricity_demand',
-                                                                                                                 'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv._plot_trajectory': ( 'env.html#electricitymarketenv._plot_trajectory',
+                                                                                                          'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._production': ( 'env.html#electricitymarketenv._production',
                                                                                                      'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv._record': ( 'env.html#electricitymarketenv._record',
+                                                                                                 'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv._render_rgb_array': ( 'env.html#electricitymarketenv._render_rgb_array',
+                                                                                                           'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._reward': ( 'env.html#electricitymarketenv._reward',
                                                                                                  'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._season': ( 'env.html#electricitymarketenv._season',
                                                                                                  'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._sell_price': ( 'env.html#electricitymarketenv._sell_price',
                                                                                                      'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv._timestep_of_year': ( 'env.html#electricitymarketenv._timestep_of_year',
+                                                                                                           'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv._valid_actions_mask': ( 'env.html#electricitymarketenv._valid_actions_mask',
+                                                                                                             'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv._weather': ( 'env.html#electricitymarketenv._weather',
                                                                                                   'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv.action_masks': ( 'env.html#electricitymarketenv.action_masks',
                                                                                                       'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv.get_state': ( 'env.html#electricitymarketenv.get_state',
+                                                                                                   'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv.render': ( 'env.html#electricitymarketenv.render',
                                                                                                 'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv.reset': ( 'env.html#electricitymarketenv.reset',
                                                                                                'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv.rollout': ( 'env.html#electricitymarketenv.rollout',
+                                                                                                 'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv.set_state': ( 'env.html#electricitymarketenv.set_state',
+                                                                                                   'electricity_market/env.py'),
                                         'electricity_market.env.ElectricityMarketEnv.step': ( 'env.html#electricitymarketenv.step',
                                                                                               'electricity_market/env.py'),
+                                        'electricity_market.env.ElectricityMarketEnv.trajectory': ( 'env.html#electricitymarketenv.trajectory',
+                                                                                                    'electricity_market/env.py'),
                                         'electricity_market.env.EnvConfig': ('env.html#envconfig', 'electricity_market/env.py'),
+                                        'electricity_market.env.EnvState': ('env.html#envstate', 'electricity_market/env.py'),
+                                        'electricity_market.env.Scenario': ('env.html#scenario', 'electricity_market/env.py'),
                                         'electricity_market.env.Season': ('env.html#season', 'electricity_market/env.py'),
-                                        'electricity_market.env.Weather': ('env.html#weather', 'electricity_market/env.py')},
-            'electricity_market.evaluation': { 'electricity_market.evaluation.plot_all_metrics': ( 'evaluation.html#plot_all_metrics',
-                                                                                                   'electricity_market/evaluation.py')},
+                                        'electricity_market.env.Trajectory': ('env.html#trajectory', 'electricity_market/env.py'),
+                                        'electricity_market.env.Weather': ('env.html#weather', 'electricity_market/env.py'),
+                                        'electricity_market.env._decimate': ('env.html#_decimate', 'electricity_market/env.py'),
+                                        'electricity_market.env._generate_scenario': ( 'env.html#_generate_scenario',
+                                                                                       'electricity_market/env.py'),
+                                        'electricity_market.env._get_seeded_scenario': ( 'env.html#_get_seeded_scenario',
+                                                                                         'electricity_market/env.py'),
+                                        'electricity_market.env._historical_scenario': ( 'env.html#_historical_scenario',
+                                                                                         'electricity_market/env.py'),
+                                        'electricity_market.env._historical_window': ( 'env.html#_historical_window',
+                                                                                       'electricity_market/env.py'),
+                                        'electricity_market.env._is_dark_hours': ('env.html#_is_dark_hours', 'electricity_market/env.py'),
+                                        'electricity_market.env._load_historical_data': ( 'env.html#_load_historical_data',
+                                                                                          'electricity_market/env.py'),
+                                        'electricity_market.env._season_indices': ('env.html#_season_indices', 'electricity_market/env.py'),
+                                        'electricity_market.env._uniform': ('env.html#_uniform', 'electricity_market/env.py'),
+                                        'electricity_market.env.get_calendar': ('env.html#get_calendar', 'electricity_market/env.py'),
+                                        'electricity_market.env.get_scenario': ('env.html#get_scenario', 'electricity_market/env.py')},
+            'electricity_market.evaluation': { 'electricity_market.evaluation._bootstrap_counts': ( 'evaluation.html#_bootstrap_counts',
+                                                                                                    'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation._iqm': ( 'evaluation.html#_iqm',
+                                                                                       'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation._mean': ( 'evaluation.html#_mean',
+                                                                                        'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation._median': ( 'evaluation.html#_median',
+                                                                                          'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation._percentile_interval': ( 'evaluation.html#_percentile_interval',
+                                                                                                       'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation.aggregate_interval_estimates': ( 'evaluation.html#aggregate_interval_estimates',
+                                                                                                               'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation.plot_all_metrics': ( 'evaluation.html#plot_all_metrics',
+                                                                                                   'electricity_market/evaluation.py'),
+                                               'electricity_market.evaluation.probability_of_improvement_interval': ( 'evaluation.html#probability_of_improvement_interval',
+                                                                                                                      'electricity_market/evaluation.py')},
+            'electricity_market.fleet': { 'electricity_market.fleet.ElectricityMarketFleetEnv': ( 'fleet.html#electricitymarketfleetenv',
+                                                                                                  'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv.__init__': ( 'fleet.html#electricitymarketfleetenv.__init__',
+                                                                                                           'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv._bin_actions': ( 'fleet.html#electricitymarketfleetenv._bin_actions',
+                                                                                                               'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv._charge_amounts': ( 'fleet.html#electricitymarketfleetenv._charge_amounts',
+                                                                                                                  'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv._draw_sites': ( 'fleet.html#electricitymarketfleetenv._draw_sites',
+                                                                                                              'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv._get_obs': ( 'fleet.html#electricitymarketfleetenv._get_obs',
+                                                                                                           'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv.action_masks': ( 'fleet.html#electricitymarketfleetenv.action_masks',
+                                                                                                               'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv.reset': ( 'fleet.html#electricitymarketfleetenv.reset',
+                                                                                                        'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv.step': ( 'fleet.html#electricitymarketfleetenv.step',
+                                                                                                       'electricity_market/fleet.py'),
+                                          'electricity_market.fleet.ElectricityMarketFleetEnv.valid_action_intervals': ( 'fleet.html#electricitymarketfleetenv.valid_action_intervals',
+                                                                                                                         'electricity_market/fleet.py')},
+            'electricity_market.numpy_policy': { 'electricity_market.numpy_policy.NumpyPolicy': ( 'numpy_policy.html#numpypolicy',
+                                                                                                  'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicy.__init__': ( 'numpy_policy.html#numpypolicy.__init__',
+                                                                                                           'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicy.action_logits': ( 'numpy_policy.html#numpypolicy.action_logits',
+                                                                                                                'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicy.load': ( 'numpy_policy.html#numpypolicy.load',
+                                                                                                       'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicy.predict': ( 'numpy_policy.html#numpypolicy.predict',
+                                                                                                          'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicy.save': ( 'numpy_policy.html#numpypolicy.save',
+                                                                                                       'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent': ( 'numpy_policy.html#numpypolicyagent',
+                                                                                                       'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.__init__': ( 'numpy_policy.html#numpypolicyagent.__init__',
+                                                                                                                'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.choose_action': ( 'numpy_policy.html#numpypolicyagent.choose_action',
+                                                                                                                     'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.choose_actions': ( 'numpy_policy.html#numpypolicyagent.choose_actions',
+                                                                                                                      'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.evaluate': ( 'numpy_policy.html#numpypolicyagent.evaluate',
+                                                                                                                'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.from_model_agent': ( 'numpy_policy.html#numpypolicyagent.from_model_agent',
+                                                                                                                        'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.load_model': ( 'numpy_policy.html#numpypolicyagent.load_model',
+                                                                                                                  'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.NumpyPolicyAgent.save_model': ( 'numpy_policy.html#numpypolicyagent.save_model',
+                                                                                                                  'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy._relu': ( 'numpy_policy.html#_relu',
+                                                                                            'electricity_market/numpy_policy.py'),
+                                                 'electricity_market.numpy_policy.export_numpy_policy': ( 'numpy_policy.html#export_numpy_policy',
+                                                                                                          'electricity_market/numpy_policy.py')},
             'electricity_market.player': { 'electricity_market.player.A2CAgent': ('player.html#a2cagent', 'electricity_market/player.py'),
                                            'electricity_market.player.A2CAgent.__init__': ( 'player.html#a2cagent.__init__',
                                                                                             'electricity_market/player.py'),
                                            'electricity_market.player.Agent': ('player.html#agent', 'electricity_market/player.py'),
                                            'electricity_market.player.Agent.__init__': ( 'player.html#agent.__init__',
                                                                                          'electricity_market/player.py'),
-                                           'electricity_market.player.Agent.choose_action': ( 'player.html#agent.choose_action',
-                                                                                              'electricity_market/player.py'),
+                                           'electricity_market.player.Agent._evaluate_in_workers': ( 'player.html#agent._evaluate_in_workers',
+                                                                                                     'electricity_market/player.py'),
+                                           'electricity_market.player.Agent._init_kwargs': ( 'player.html#agent._init_kwargs',
+                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.Agent._save_model_for_workers': ( 'player.html#agent._save_model_for_workers',
+                                                                                                        'electricity_market/player.py'),
+                                           'electricity_market.player.Agent._write_profile': ( 'player.html#agent._write_profile',
+                                                                                               'electricity_market/player.py'),
                                            'electricity_market.player.Agent.evaluate': ( 'player.html#agent.evaluate',
                                                                                          'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback': ( 'player.html#asynccheckpointcallback',
+                                                                                                  'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback.__init__': ( 'player.html#asynccheckpointcallback.__init__',
+                                                                                                           'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._checkpoint': ( 'player.html#asynccheckpointcallback._checkpoint',
+                                                                                                              'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._init_callback': ( 'player.html#asynccheckpointcallback._init_callback',
+                                                                                                                 'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._on_step': ( 'player.html#asynccheckpointcallback._on_step',
+                                                                                                           'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._on_training_end': ( 'player.html#asynccheckpointcallback._on_training_end',
+                                                                                                                   'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._on_training_start': ( 'player.html#asynccheckpointcallback._on_training_start',
+                                                                                                                     'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._save': ( 'player.html#asynccheckpointcallback._save',
+                                                                                                        'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback._write': ( 'player.html#asynccheckpointcallback._write',
+                                                                                                         'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback.best_checkpoint_path': ( 'player.html#asynccheckpointcallback.best_checkpoint_path',
+                                                                                                                       'electricity_market/player.py'),
+                                           'electricity_market.player.AsyncCheckpointCallback.wait': ( 'player.html#asynccheckpointcallback.wait',
+                                                                                                       'electricity_market/player.py'),
+                                           'electricity_market.player.CompactPPOAgent': ( 'player.html#compactppoagent',
+                                                                                          'electricity_market/player.py'),
+                                           'electricity_market.player.CompactPPOAgent.__init__': ( 'player.html#compactppoagent.__init__',
+                                                                                                   'electricity_market/player.py'),
+                                           'electricity_market.player.CompactPPOAgent._episode_timesteps': ( 'player.html#compactppoagent._episode_timesteps',
+                                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.CompactPPOAgent._init_kwargs': ( 'player.html#compactppoagent._init_kwargs',
+                                                                                                       'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent': ('player.html#dpagent', 'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent.__init__': ( 'player.html#dpagent.__init__',
+                                                                                           'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent._greedy_action': ( 'player.html#dpagent._greedy_action',
+                                                                                                 'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent._init_kwargs': ( 'player.html#dpagent._init_kwargs',
+                                                                                               'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent._save_model_for_workers': ( 'player.html#dpagent._save_model_for_workers',
+                                                                                                          'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent.choose_action': ( 'player.html#dpagent.choose_action',
+                                                                                                'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent.choose_actions': ( 'player.html#dpagent.choose_actions',
+                                                                                                 'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent.load_model': ( 'player.html#dpagent.load_model',
+                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent.save_model': ( 'player.html#dpagent.save_model',
+                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.DPAgent.train': ( 'player.html#dpagent.train',
+                                                                                        'electricity_market/player.py'),
                                            'electricity_market.player.MaskableAgent': ( 'player.html#maskableagent',
                                                                                         'electricity_market/player.py'),
                                            'electricity_market.player.MaskableAgent.mask_fn': ( 'player.html#maskableagent.mask_fn',
@@ -80,12 +313,20 @@ d = { 'settings': { 'branch': 'main',
                                                                                              'electricity_market/player.py'),
                                            'electricity_market.player.MaskableModelAgent.choose_action': ( 'player.html#maskablemodelagent.choose_action',
                                                                                                            'electricity_market/player.py'),
+                                           'electricity_market.player.MaskableModelAgent.choose_actions': ( 'player.html#maskablemodelagent.choose_actions',
+                                                                                                            'electricity_market/player.py'),
                                            'electricity_market.player.MaskablePPOAgent': ( 'player.html#maskableppoagent',
                                                                                            'electricity_market/player.py'),
                                            'electricity_market.player.MaskablePPOAgent.__init__': ( 'player.html#maskableppoagent.__init__',
                                                                                                     'electricity_market/player.py'),
+                                           'electricity_market.player.MaskablePPOAgent._create_study': ( 'player.html#maskableppoagent._create_study',
+                                                                                                         'electricity_market/player.py'),
+                                           'electricity_market.player.MaskablePPOAgent._objective': ( 'player.html#maskableppoagent._objective',
+                                                                                                      'electricity_market/player.py'),
                                            'electricity_market.player.MaskablePPOAgent.choose_action': ( 'player.html#maskableppoagent.choose_action',
                                                                                                          'electricity_market/player.py'),
+                                           'electricity_market.player.MaskablePPOAgent.choose_actions': ( 'player.html#maskableppoagent.choose_actions',
+                                                                                                          'electricity_market/player.py'),
                                            'electricity_market.player.MaskablePPOAgent.export_hyperparameters': ( 'player.html#maskableppoagent.export_hyperparameters',
                                                                                                                   'electricity_market/player.py'),
                                            'electricity_market.player.MaskablePPOAgent.optimize': ( 'player.html#maskableppoagent.optimize',
@@ -96,21 +337,182 @@ d = { 'settings': { 'branch': 'main',
                                                                                                        'electricity_market/player.py'),
                                            'electricity_market.player.MaskableRandomAgent.choose_action': ( 'player.html#maskablerandomagent.choose_action',
                                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.MaskableRandomAgent.choose_actions': ( 'player.html#maskablerandomagent.choose_actions',
+                                                                                                             'electricity_market/player.py'),
                                            'electricity_market.player.ModelAgent': ( 'player.html#modelagent',
                                                                                      'electricity_market/player.py'),
                                            'electricity_market.player.ModelAgent.__init__': ( 'player.html#modelagent.__init__',
                                                                                               'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._checkpoint_callback': ( 'player.html#modelagent._checkpoint_callback',
+                                                                                                          'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._checkpoint_reward': ( 'player.html#modelagent._checkpoint_reward',
+                                                                                                        'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._episode_timesteps': ( 'player.html#modelagent._episode_timesteps',
+                                                                                                        'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._profiling_callback': ( 'player.html#modelagent._profiling_callback',
+                                                                                                         'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._reload_model': ( 'player.html#modelagent._reload_model',
+                                                                                                   'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._save_model_for_workers': ( 'player.html#modelagent._save_model_for_workers',
+                                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent._train_in_workers': ( 'player.html#modelagent._train_in_workers',
+                                                                                                       'electricity_market/player.py'),
                                            'electricity_market.player.ModelAgent.choose_action': ( 'player.html#modelagent.choose_action',
                                                                                                    'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent.choose_actions': ( 'player.html#modelagent.choose_actions',
+                                                                                                    'electricity_market/player.py'),
+                                           'electricity_market.player.ModelAgent.load_checkpoint': ( 'player.html#modelagent.load_checkpoint',
+                                                                                                     'electricity_market/player.py'),
                                            'electricity_market.player.ModelAgent.load_model': ( 'player.html#modelagent.load_model',
                                                                                                 'electricity_market/player.py'),
                                            'electricity_market.player.ModelAgent.save_model': ( 'player.html#modelagent.save_model',
                                                                                                 'electricity_market/player.py'),
                                            'electricity_market.player.ModelAgent.train': ( 'player.html#modelagent.train',
                                                                                            'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback': ( 'player.html#profilingcallback',
+                                                                                            'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback.__init__': ( 'player.html#profilingcallback.__init__',
+                                                                                                     'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback._on_rollout_end': ( 'player.html#profilingcallback._on_rollout_end',
+                                                                                                            'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback._on_step': ( 'player.html#profilingcallback._on_step',
+                                                                                                     'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback._on_training_end': ( 'player.html#profilingcallback._on_training_end',
+                                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback._on_training_start': ( 'player.html#profilingcallback._on_training_start',
+                                                                                                               'electricity_market/player.py'),
+                                           'electricity_market.player.ProfilingCallback.flush': ( 'player.html#profilingcallback.flush',
+                                                                                                  'electricity_market/player.py'),
+                                           'electricity_market.player._SeedScheduleWrapper': ( 'player.html#_seedschedulewrapper',
+                                                                                               'electricity_market/player.py'),
+                                           'electricity_market.player._SeedScheduleWrapper.__init__': ( 'player.html#_seedschedulewrapper.__init__',
+                                                                                                        'electricity_market/player.py'),
+                                           'electricity_market.player._SeedScheduleWrapper.reset': ( 'player.html#_seedschedulewrapper.reset',
+                                                                                                     'electricity_market/player.py'),
+                                           'electricity_market.player._evaluate_seed_in_worker': ( 'player.html#_evaluate_seed_in_worker',
+                                                                                                   'electricity_market/player.py'),
+                                           'electricity_market.player._expert_masks_enabled': ( 'player.html#_expert_masks_enabled',
+                                                                                                'electricity_market/player.py'),
+                                           'electricity_market.player._init_evaluation_worker': ( 'player.html#_init_evaluation_worker',
+                                                                                                  'electricity_market/player.py'),
+                                           'electricity_market.player._init_worker': ( 'player.html#_init_worker',
+                                                                                       'electricity_market/player.py'),
+                                           'electricity_market.player._journal_storage': ( 'player.html#_journal_storage',
+                                                                                           'electricity_market/player.py'),
+                                           'electricity_market.player._make_training_env': ( 'player.html#_make_training_env',
+                                                                                             'electricity_market/player.py'),
+                                           'electricity_market.player._optimize_in_worker': ( 'player.html#_optimize_in_worker',
+                                                                                              'electricity_market/player.py'),
+                                           'electricity_market.player._write_durations': ( 'player.html#_write_durations',
+                                                                                           'electricity_market/player.py'),
                                            'electricity_market.player.expert_knowledge_action_masks': ( 'player.html#expert_knowledge_action_masks',
                                                                                                         'electricity_market/player.py'),
                                            'electricity_market.player.is_action_safe': ( 'player.html#is_action_safe',
                                                                                          'electricity_market/player.py')},
-            'electricity_market.utils': { 'electricity_market.utils.EvaluationData': ( 'utils.html#evaluationdata',
-                                                                                       'electricity_market/utils.py')}}}
+            'electricity_market.profiling': { 'electricity_market.profiling.HotPathProfiler': ( 'profiling.html#hotpathprofiler',
+                                                                                                'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.__enter__': ( 'profiling.html#hotpathprofiler.__enter__',
+                                                                                                          'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.__exit__': ( 'profiling.html#hotpathprofiler.__exit__',
+                                                                                                         'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.__init__': ( 'profiling.html#hotpathprofiler.__init__',
+                                                                                                         'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.disable': ( 'profiling.html#hotpathprofiler.disable',
+                                                                                                        'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.enable': ( 'profiling.html#hotpathprofiler.enable',
+                                                                                                       'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.enabled': ( 'profiling.html#hotpathprofiler.enabled',
+                                                                                                        'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.pop_durations': ( 'profiling.html#hotpathprofiler.pop_durations',
+                                                                                                              'electricity_market/profiling.py'),
+                                              'electricity_market.profiling.HotPathProfiler.record': ( 'profiling.html#hotpathprofiler.record',
+                                                                                                       'electricity_market/profiling.py'),
+                                              'electricity_market.profiling._Patch': ( 'profiling.html#_patch',
+                                                                                       'electricity_market/profiling.py'),
+                                              'electricity_market.profiling._Patch.__init__': ( 'profiling.html#_patch.__init__',
+                                                                                                'electricity_market/profiling.py'),
+                                              'electricity_market.profiling._Patch._timed': ( 'profiling.html#_patch._timed',
+                                                                                              'electricity_market/profiling.py'),
+                                              'electricity_market.profiling._defining_classes': ( 'profiling.html#_defining_classes',
+                                                                                                  'electricity_market/profiling.py')},
+            'electricity_market.utils': { 'electricity_market.utils.EpisodeTraceWriter': ( 'utils.html#episodetracewriter',
+                                                                                           'electricity_market/utils.py'),
+                                          'electricity_market.utils.EpisodeTraceWriter.__init__': ( 'utils.html#episodetracewriter.__init__',
+                                                                                                    'electricity_market/utils.py'),
+                                          'electricity_market.utils.EpisodeTraceWriter._append_chunk': ( 'utils.html#episodetracewriter._append_chunk',
+                                                                                                         'electricity_market/utils.py'),
+                                          'electricity_market.utils.EpisodeTraceWriter._write_header': ( 'utils.html#episodetracewriter._write_header',
+                                                                                                         'electricity_market/utils.py'),
+                                          'electricity_market.utils.EpisodeTraceWriter.close': ( 'utils.html#episodetracewriter.close',
+                                                                                                 'electricity_market/utils.py'),
+                                          'electricity_market.utils.EpisodeTraceWriter.write': ( 'utils.html#episodetracewriter.write',
+                                                                                                 'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationData': ( 'utils.html#evaluationdata',
+                                                                                       'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationData.regrets': ( 'utils.html#evaluationdata.regrets',
+                                                                                               'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop': ( 'utils.html#evaluationloop',
+                                                                                       'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop._evaluate_batched': ( 'utils.html#evaluationloop._evaluate_batched',
+                                                                                                         'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop._evaluate_seed': ( 'utils.html#evaluationloop._evaluate_seed',
+                                                                                                      'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop._evaluation_data': ( 'utils.html#evaluationloop._evaluation_data',
+                                                                                                        'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop._trace_writer': ( 'utils.html#evaluationloop._trace_writer',
+                                                                                                     'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop.choose_action': ( 'utils.html#evaluationloop.choose_action',
+                                                                                                     'electricity_market/utils.py'),
+                                          'electricity_market.utils.EvaluationLoop.choose_actions': ( 'utils.html#evaluationloop.choose_actions',
+                                                                                                      'electricity_market/utils.py'),
+                                          'electricity_market.utils.load_evaluation_data': ( 'utils.html#load_evaluation_data',
+                                                                                             'electricity_market/utils.py'),
+                                          'electricity_market.utils.load_traces': ('utils.html#load_traces', 'electricity_market/utils.py'),
+                                          'electricity_market.utils.write_oracle_rewards': ( 'utils.html#write_oracle_rewards',
+                                                                                             'electricity_market/utils.py')},
+            'electricity_market.vec_env': { 'electricity_market.vec_env.ElectricityMarketVecEnv': ( 'vec_env.html#electricitymarketvecenv',
+                                                                                                    'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.__init__': ( 'vec_env.html#electricitymarketvecenv.__init__',
+                                                                                                             'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv._check_all_indices': ( 'vec_env.html#electricitymarketvecenv._check_all_indices',
+                                                                                                                       'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv._get_obs': ( 'vec_env.html#electricitymarketvecenv._get_obs',
+                                                                                                             'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv._reset_env': ( 'vec_env.html#electricitymarketvecenv._reset_env',
+                                                                                                               'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv._update_market': ( 'vec_env.html#electricitymarketvecenv._update_market',
+                                                                                                                   'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.action_masks': ( 'vec_env.html#electricitymarketvecenv.action_masks',
+                                                                                                                 'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.close': ( 'vec_env.html#electricitymarketvecenv.close',
+                                                                                                          'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.env_is_wrapped': ( 'vec_env.html#electricitymarketvecenv.env_is_wrapped',
+                                                                                                                   'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.env_method': ( 'vec_env.html#electricitymarketvecenv.env_method',
+                                                                                                               'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.get_attr': ( 'vec_env.html#electricitymarketvecenv.get_attr',
+                                                                                                             'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.reset': ( 'vec_env.html#electricitymarketvecenv.reset',
+                                                                                                          'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.set_attr': ( 'vec_env.html#electricitymarketvecenv.set_attr',
+                                                                                                             'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.step_async': ( 'vec_env.html#electricitymarketvecenv.step_async',
+                                                                                                               'electricity_market/vec_env.py'),
+                                            'electricity_market.vec_env.ElectricityMarketVecEnv.step_wait': ( 'vec_env.html#electricitymarketvecenv.step_wait',
+                                                                                                              'electricity_market/vec_env.py')},
+            'electricity_market.wrappers': { 'electricity_market.wrappers.CompactActionWrapper': ( 'wrappers.html#compactactionwrapper',
+                                                                                                   'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.CompactActionWrapper.__init__': ( 'wrappers.html#compactactionwrapper.__init__',
+                                                                                                            'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.CompactActionWrapper.action': ( 'wrappers.html#compactactionwrapper.action',
+                                                                                                          'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.CompactActionWrapper.valid_action_interval': ( 'wrappers.html#compactactionwrapper.valid_action_interval',
+                                                                                                                         'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.DecisionIntervalWrapper': ( 'wrappers.html#decisionintervalwrapper',
+                                                                                                      'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.DecisionIntervalWrapper.__init__': ( 'wrappers.html#decisionintervalwrapper.__init__',
+                                                                                                               'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.DecisionIntervalWrapper._plan_space': ( 'wrappers.html#decisionintervalwrapper._plan_space',
+                                                                                                                  'electricity_market/wrappers.py'),
+                                             'electricity_market.wrappers.DecisionIntervalWrapper.step': ( 'wrappers.html#decisionintervalwrapper.step',
+                                                                                                           'electricity_market/wrappers.py')}}}
@@ -0,0 +1,140 @@
+"""This module provides the battery dynamics of the environment for arrays of batteries."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_battery_dynamics.ipynb.
+
+# %% auto 0
+__all__ = ['BatteryDynamics']
+
+# %% ../nbs/04_battery_dynamics.ipynb 3
+import numpy as np
+
+from .env import ElectricityMarketEnv
+
+# %% ../nbs/04_battery_dynamics.ipynb 4
+class BatteryDynamics:
+    """
+    The battery rules of `ElectricityMarketEnv.step` applied to arrays of batteries, the charge,
+    degradation, rewards, masks and observations shared by `ElectricityMarketVecEnv` and
+    `ElectricityMarketFleetEnv`.
+
+    The environments hold the state of charge and battery capacity of their batteries, and the
+    production, sell price and demand of every battery at the current timestep, `step` updates
+    the state arrays in place.
+    """
+
+    def __init__(self, env: ElectricityMarketEnv):
+        # the scalar environment defines the actions and the normalization bounds
+        self._config = env._config
+        self.action_values = env._action_values
+        self.min_battery_capacity = env._min_battery_capacity
+        self._unsafe_degradation = env._unsafe_battery_degradation_factor
+        self._max_demand_of_electricity = env._max_demand_of_electricity
+        self._max_price = env._max_price
+        self._max_reward = env._max_reward
+
+    def is_done(self, battery_capacity: np.ndarray) -> np.ndarray:
+        return battery_capacity <= self.min_battery_capacity
+
+    def safe_range(self, battery_capacity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        low, high = self._config.battery_safe_range_ratios
+        return low * battery_capacity, high * battery_capacity
+
+    def is_safe_range_violation(
+        self, state_of_charge: np.ndarray, battery_capacity: np.ndarray
+    ) -> np.ndarray:
+        low, high = self.safe_range(battery_capacity)
+        return (state_of_charge < low) | (state_of_charge > high)
+
+    def charge_amounts(
+        self, actions: np.ndarray, demand_of_electricity: np.ndarray
+    ) -> np.ndarray:
+        return np.ceil(self.action_values[actions] - demand_of_electricity)
+
+    def step(
+        self,
+        state_of_charge: np.ndarray,
+        battery_capacity: np.ndarray,
+        charge_amounts: np.ndarray,
+        production: np.ndarray,
+        sell_price: np.ndarray,
+        is_active: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Charge the batteries by `charge_amounts` and degrade them, and return their rewards.
+
+        The batteries that aren't `is_active` are left as they are, and their rewards are 0.
+        """
+        target_state_of_charge = state_of_charge + charge_amounts
+        is_valid = (
+            (charge_amounts <= production)
+            & (target_state_of_charge >= 0)
+            & (target_state_of_charge <= battery_capacity)
+        )
+        if is_active is not None:
+            is_valid &= is_active
+        np.copyto(state_of_charge, target_state_of_charge, where=is_valid)
+        battery_capacity *= np.where(
+            is_valid, self._config.battery_degradation_factor, 1.0
+        )
+        # if violated the safe range, extra degradation
+        battery_capacity *= np.where(
+            is_valid & self.is_safe_range_violation(state_of_charge, battery_capacity),
+            self._unsafe_degradation,
+            1.0,
+        )
+
+        sell_amounts = production - charge_amounts
+        rewards = np.where(
+            sell_amounts < 0, -0.5, sell_amounts * sell_price / self._max_reward
+        )
+        # `_reward` checks the safe range again, after the extra degradation
+        rewards[self.is_safe_range_violation(state_of_charge, battery_capacity)] = -0.8
+        rewards[~is_valid] = -1.0
+        if is_active is not None:
+            rewards[~is_active] = 0.0
+        return rewards
+
+    def action_masks(
+        self,
+        state_of_charge: np.ndarray,
+        battery_capacity: np.ndarray,
+        production: np.ndarray,
+        demand_of_electricity: np.ndarray,
+    ) -> np.ndarray:
+        """The `(n_batteries, n_actions)` boolean mask of valid actions for `MaskablePPO`."""
+        charge_amounts = np.ceil(
+            self.action_values[None, :] - demand_of_electricity[:, None]
+        )
+        target_state_of_charge = state_of_charge[:, None] + charge_amounts
+        masks = (
+            (charge_amounts <= production[:, None])
+            & (target_state_of_charge >= 0)
+            & (target_state_of_charge <= battery_capacity[:, None])
+        )
+        # If all actions are invalid, force one to be valid
+        masks[~masks.any(axis=1), masks.shape[1] // 2] = True
+        return masks
+
+    def observations(
+        self,
+        state_of_charge: np.ndarray,
+        battery_capacity: np.ndarray,
+        production: np.ndarray,
+        demand_of_electricity: np.ndarray,
+        sell_price: np.ndarray,
+    ) -> np.ndarray:
+        """The `(n_batteries, 8)` observations of the batteries, as `ElectricityMarketEnv._get_obs`."""
+        low, high = self.safe_range(battery_capacity)
+        observations = np.empty((len(state_of_charge), 8), dtype=np.float64)
+        observations[:, 0] = state_of_charge
+        observations[:, 1] = battery_capacity
+        observations[:, 2] = low
+        observations[:, 3] = high
+        observations[:, :4] /= self._config.init_battery_capacity
+        observations[:, 4] = demand_of_electricity / self._max_demand_of_electricity
+        observations[:, 5] = sell_price / self._max_price
+        observations[:, 6] = ~self.is_safe_range_violation(
+            state_of_charge, battery_capacity
+        )
+        observations[:, 7] = production / self._config.production_capacity
+        return observations
@@ -0,0 +1,377 @@
+"""This module measures the throughput of the simulator, the action masks, the agents and their training."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/20_benchmark.ipynb.
+
+# %% auto 0
+__all__ = ['BENCHMARK_CONFIGS', 'BENCHMARK_SUITES', 'benchmark_env', 'benchmark_agents', 'benchmark_training', 'run_benchmarks',
+           'compare_results', 'main']
+
+# %% ../nbs/20_benchmark.ipynb 3
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+from . import __version__
+from .env import ElectricityMarketEnv, EnvConfig
+from .fleet import ElectricityMarketFleetEnv
+from .numpy_policy import NumpyPolicyAgent
+
+# %% ../nbs/20_benchmark.ipynb 4
+# "quick" is the environment configuration of the `QUICK_MODE` runs
+BENCHMARK_CONFIGS = {
+    "default": EnvConfig(),
+    "quick": EnvConfig(max_timestep=10),
+}
+BENCHMARK_SUITES = ("env", "agents", "training")
+
+# %% ../nbs/20_benchmark.ipynb 5
+_BENCHMARK_SEEDS = [90000 + i for i in range(16)]
+_PACKAGES = ("numpy", "gymnasium", "torch", "stable-baselines3", "sb3-contrib")
+
+
+def _best_rate(run, repeats: int) -> float:
+    """The best rate of `repeats` runs, `run` returns the number of completed units."""
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        n_units = run()
+        best = max(best, n_units / (time.perf_counter() - start))
+    return best
+
+
+def _rate_result(value: float, unit: str) -> dict:
+    return {"value": value, "unit": unit, "higher_is_better": True}
+
+
+def _latency_result(value: float) -> dict:
+    return {"value": value, "unit": "us/call", "higher_is_better": False}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_version(package: str) -> str | None:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _metadata(config_names: list[str], repeats: int) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "electricity_market": __version__,
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": {package: _package_version(package) for package in _PACKAGES},
+        "repeats": repeats,
+        "configs": {name: asdict(BENCHMARK_CONFIGS[name]) for name in config_names},
+    }
+
+# %% ../nbs/20_benchmark.ipynb 6
+def benchmark_env(config: EnvConfig, repeats: int = 5, n_calls: int = 10_000) -> dict:
+    """
+    Steps and resets per second of `ElectricityMarketEnv`, µs per call of its masks and of a
+    snapshot round trip, steps per second of its batched rollouts, and steps per second of a
+    fleet of a thousand batteries.
+    """
+    from electricity_market.player import expert_knowledge_action_masks
+
+    env = ElectricityMarketEnv(config)
+    rng = np.random.default_rng(0)
+    seeds = _BENCHMARK_SEEDS
+
+    # only the `step` calls are timed, the valid actions are chosen between them
+    def step_rate() -> float:
+        env.reset(seed=seeds[0])
+        elapsed = 0.0
+        for _ in range(n_calls):
+            action = rng.choice(np.flatnonzero(env.action_masks()))
+            start = time.perf_counter()
+            _, _, terminated, truncated, _ = env.step(action)
+            elapsed += time.perf_counter() - start
+            if terminated or truncated:
+                env.reset(seed=seeds[0])
+        return n_calls / elapsed
+
+    def reset() -> int:
+        for seed in seeds:
+            env.reset(seed=seed)
+        return len(seeds)
+
+    def masks(action_masks) -> int:
+        for _ in range(n_calls):
+            action_masks(env)
+        return n_calls
+
+    results = {
+        "env.step": _rate_result(max(step_rate() for _ in range(repeats)), "steps/s")
+    }
+    # the scenarios of the seeds are generated once, the timed resets use the cache
+    reset()
+    results["env.reset"] = _rate_result(_best_rate(reset, repeats), "resets/s")
+    env.reset(seed=seeds[0])
+    for name, action_masks in [
+        ("action_masks", ElectricityMarketEnv.action_masks),
+        ("expert_knowledge_action_masks", expert_knowledge_action_masks),
+    ]:
+        calls_per_second = _best_rate(lambda: masks(action_masks), repeats)
+        results[f"env.{name}"] = _latency_result(1e6 / calls_per_second)
+
+    def snapshots() -> int:
+        for _ in range(n_calls):
+            env.set_state(env.get_state())
+        return n_calls
+
+    results["env.snapshot"] = _latency_result(1e6 / _best_rate(snapshots, repeats))
+    # a thousand branches over a simulated day
+    state = env.get_state()
+    action_sequences = rng.integers(env.action_space.n, size=(1000, 6))
+
+    def rollout() -> int:
+        env.rollout(state, action_sequences)
+        return action_sequences.size
+
+    results["env.rollout"] = _rate_result(_best_rate(rollout, repeats), "steps/s")
+
+    fleet = ElectricityMarketFleetEnv(1000, config, n_bins=21)
+    fleet_actions = np.full(fleet.n_batteries, 10)
+
+    def fleet_steps(n_steps=1000) -> int:
+        fleet.reset(seed=seeds[0])
+        for _ in range(n_steps):
+            _, _, done, _, _ = fleet.step(fleet_actions)
+            if done:
+                fleet.reset(seed=seeds[0])
+        return n_steps
+
+    results["fleet.step"] = _rate_result(_best_rate(fleet_steps, repeats), "steps/s")
+    return results
+
+
+def benchmark_agents(
+    config: EnvConfig,
+    models_dir: Path = Path("trained_models"),
+    repeats: int = 3,
+    n_episodes: int = 1,
+) -> dict:
+    """
+    Evaluated episodes per second of `MaskableRandomAgent` and of the trained models, and µs per
+    `choose_action` of every agent.
+
+    The models are loaded from `models_dir/<agent class>.model`, missing models are only timed
+    choosing actions, which doesn't depend on their weights. The A2C and MaskablePPO models are
+    also run as a `NumpyPolicyAgent`, whose `NumpyPolicy.predict` is timed on its own too.
+    """
+    from electricity_market.player import (
+        A2CAgent,
+        CompactPPOAgent,
+        MaskablePPOAgent,
+        MaskableRandomAgent,
+    )
+
+    agents, untrained_agents = [MaskableRandomAgent(config)], []
+    for agent_class in (A2CAgent, MaskablePPOAgent, CompactPPOAgent):
+        agent = agent_class(config)
+        model_path = Path(models_dir) / f"{agent_class.__name__}.model"
+        agent_group = agents if model_path.exists() else untrained_agents
+        if model_path.exists():
+            agent.load_model(model_path)
+        agent_group.append(agent)
+        # the compact actions are chosen by a wrapper, they aren't exported
+        if agent_class is CompactPPOAgent:
+            continue
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent_group.append(
+                NumpyPolicyAgent.from_model_agent(agent, Path(tmp_dir) / "policy.npz")
+            )
+
+    seeds = _BENCHMARK_SEEDS[:n_episodes]
+    results = {}
+    for agent in agents:
+        # the episodes of `Agent.evaluate`, without its progress bar and fixed seeds
+        def evaluate(agent=agent) -> int:
+            for seed in seeds:
+                agent._evaluate_seed(seed)
+            return len(seeds)
+
+        results[f"evaluate.{agent.name}"] = _rate_result(
+            _best_rate(evaluate, repeats), "episodes/s"
+        )
+
+    for agent in agents + untrained_agents:
+        obs, _ = agent.env.reset(seed=seeds[0])
+
+        def choose_actions(agent=agent, obs=obs, n_calls=1000) -> int:
+            for _ in range(n_calls):
+                agent.choose_action(obs)
+            return n_calls
+
+        results[f"choose_action.{agent.name}"] = _latency_result(
+            1e6 / _best_rate(choose_actions, repeats)
+        )
+        if not isinstance(agent, NumpyPolicyAgent):
+            continue
+        action_masks = agent.env.action_masks() if agent.policy.maskable else None
+
+        # the inference alone, without the masks of the env
+        def predict(policy=agent.policy, obs=obs, n_calls=1000) -> int:
+            for _ in range(n_calls):
+                policy.predict(obs, action_masks)
+            return n_calls
+
+        results[f"predict.{agent.name}"] = _latency_result(
+            1e6 / _best_rate(predict, repeats)
+        )
+    return results
+
+
+def benchmark_training(
+    config: EnvConfig, repeats: int = 3, total_timesteps: int = 2048
+) -> dict:
+    """Samples per second of `learn` for `A2CAgent`, `MaskablePPOAgent` and `CompactPPOAgent`."""
+    from electricity_market.player import A2CAgent, CompactPPOAgent, MaskablePPOAgent
+
+    results = {}
+    for agent_class in (A2CAgent, MaskablePPOAgent, CompactPPOAgent):
+        agent = agent_class(config)
+        agent.model.tensorboard_log = None
+        agent.model.set_random_seed(0)
+
+        def learn(model=agent.model) -> int:
+            n_timesteps = model.num_timesteps
+            model.learn(total_timesteps=total_timesteps, reset_num_timesteps=False)
+            return model.num_timesteps - n_timesteps
+
+        results[f"learn.{agent.name}"] = _rate_result(
+            _best_rate(learn, repeats), "samples/s"
+        )
+    return results
+
+# %% ../nbs/20_benchmark.ipynb 7
+_SUITES = {
+    "env": benchmark_env,
+    "agents": benchmark_agents,
+    "training": benchmark_training,
+}
+
+
+def run_benchmarks(
+    config_names: list[str] | None = None,
+    suites: list[str] | None = None,
+    repeats: int = 3,
+    models_dir: Path = Path("trained_models"),
+) -> dict:
+    """
+    Runs the `suites` on every configuration of `config_names` and returns the JSON-ready results.
+
+    All the configurations and suites are run by default.
+    """
+    if config_names is None:
+        config_names = list(BENCHMARK_CONFIGS)
+    if suites is None:
+        suites = list(BENCHMARK_SUITES)
+    benchmarks = {}
+    for config_name in config_names:
+        config = BENCHMARK_CONFIGS[config_name]
+        for suite in suites:
+            kwargs = {"models_dir": models_dir} if suite == "agents" else {}
+            results = _SUITES[suite](config, repeats=repeats, **kwargs)
+            for name, result in results.items():
+                benchmarks[f"{name}[{config_name}]"] = result
+    return {"metadata": _metadata(config_names, repeats), "benchmarks": benchmarks}
+
+
+def compare_results(baseline: dict, current: dict) -> dict[str, float]:
+    """
+    The relative change of every benchmark in both results, positive when `current` is faster.
+
+    e.g. 0.25 is 25% more steps per second or 20% less µs per call.
+    """
+    changes = {}
+    for name, result in current["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        ratio = result["value"] / baseline["benchmarks"][name]["value"]
+        changes[name] = ratio - 1 if result["higher_is_better"] else 1 / ratio - 1
+    return changes
+
+# %% ../nbs/20_benchmark.ipynb 9
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the electricity market package."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks and write them as JSON")
+    run.add_argument(
+        "--configs",
+        nargs="+",
+        choices=list(BENCHMARK_CONFIGS),
+        default=list(BENCHMARK_CONFIGS),
+    )
+    run.add_argument(
+        "--suites", nargs="+", choices=BENCHMARK_SUITES, default=list(BENCHMARK_SUITES)
+    )
+    run.add_argument("--repeats", type=int, default=3)
+    run.add_argument("--models-dir", type=Path, default=Path("trained_models"))
+    run.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+
+    compare = commands.add_parser(
+        "compare", help="flag the regressions against a baseline"
+    )
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument(
+        "--tolerance", type=float, default=0.1, help="allowed relative slowdown"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.command == "run":
+        results = run_benchmarks(
+            args.configs, args.suites, args.repeats, args.models_dir
+        )
+        args.output.write_text(json.dumps(results, indent=2))
+        for name, result in results["benchmarks"].items():
+            print(f"{name}: {result['value']:.4g} {result['unit']}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    regressions = 0
+    for name, change in compare_results(baseline, current).items():
+        regressed = change < -args.tolerance
+        regressions += regressed
+        print(
+            f"{name}: {baseline['benchmarks'][name]['value']:.4g} -> "
+            f"{current['benchmarks'][name]['value']:.4g} "
+            f"{current['benchmarks'][name]['unit']} ({change:+.1%})"
+            + (" REGRESSION" if regressed else "")
+        )
+    return int(regressions > 0)
@@ -0,0 +1,337 @@
+"""This module solves the battery MDP of the environment with dynamic programming."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/08_dynamic_programming.ipynb.
+
+# %% auto 0
+__all__ = ['BatteryDP', 'perfect_foresight_rewards', 'perfect_foresight_actions']
+
+# %% ../nbs/08_dynamic_programming.ipynb 3
+import math
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from .env import ElectricityMarketEnv, EnvConfig, get_scenario
+
+# %% ../nbs/08_dynamic_programming.ipynb 4
+# the reward of a valid action violating the safe range, as `ElectricityMarketEnv._reward`
+_UNSAFE_REWARD = -0.8
+
+# %% ../nbs/08_dynamic_programming.ipynb 5
+class BatteryDP:
+    """
+    Backward induction on the battery MDP of an `EnvConfig`, the expected-return baseline of the environment.
+
+    The state is the integer state of charge, the degradation of the battery and the timestep.
+    The battery capacity is `init_battery_capacity * battery_degradation_factor**k`, and `k` is
+    interpolated between `n_capacity_levels` levels up to the termination capacity.
+    The weather, sell price and production of a timestep are observed before acting, the values
+    are their expectation over the weathers of the season and `n_price_levels` sell price levels.
+    The demand only shifts the charge amount of each action, the charges up to the production
+    are assumed to be in the action range.
+
+    Only the values of every `checkpoint_interval` timesteps are kept, the values of the other
+    timesteps are recomputed from them a block at a time. The last `n_cached_blocks` blocks are
+    kept, all of them with `None`, so that replaying the episode of another seed doesn't
+    recompute them. A block takes `checkpoint_interval * n_capacity_levels * (capacity + 1)`
+    floats, and all of them as much as the values of every timestep.
+    """
+
+    def __init__(
+        self,
+        env_config: EnvConfig | None = None,
+        n_capacity_levels: int = 16,
+        n_price_levels: int = 5,
+        checkpoint_interval: int = 256,
+        n_cached_blocks: int | None = 1,
+    ):
+        config = env_config or EnvConfig()
+        self.env_config = config
+        env = ElectricityMarketEnv(
+            replace(config, max_timestep=0, record_trajectory=False)
+        )
+        self._calendar = env._calendar
+        self._max_reward = env._max_reward
+        self._init_capacity = config.init_battery_capacity
+        self._degradation_factor = config.battery_degradation_factor
+        # steps are taken at the timesteps 0 to `max_timestep`
+        self._horizon = config.max_timestep + 1
+        self._checkpoint_interval = checkpoint_interval
+        self._checkpoints = None
+        self._n_cached_blocks = n_cached_blocks
+        self._blocks = OrderedDict()
+
+        # the degradation `k` of the termination capacity, the levels are `k_level * level`
+        self._k_termination = math.log(
+            config.battery_capacity_ratio_for_termination
+        ) / math.log(config.battery_degradation_factor)
+        self._k_level = self._k_termination / n_capacity_levels
+        self._k_unsafe = 1 + config.battery_unsafe_degradation_exponent
+        if self._k_level <= self._k_unsafe:
+            raise ValueError(
+                f"{n_capacity_levels} capacity levels are too fine for the degradation of a step"
+            )
+        capacities = (
+            config.init_battery_capacity
+            * config.battery_degradation_factor
+            ** (self._k_level * np.arange(n_capacity_levels))
+        )
+        self._socs = np.arange(math.floor(config.init_battery_capacity) + 1)
+        max_socs = np.floor(capacities)[:, None]
+        # the safe range is checked with the degraded capacity, before the extra degradation
+        low, high = config.battery_safe_range_ratios
+        next_capacities = capacities[:, None] * config.battery_degradation_factor
+        unsafe = (self._socs < low * next_capacities) | (
+            self._socs > high * next_capacities
+        )
+        self._safe_targets = (self._socs <= max_socs) & ~unsafe
+        self._unsafe_targets = (self._socs <= max_socs) & unsafe
+
+        # the highest target state of charge, by weather, capacity level and state of charge
+        self._day_productions = self._calendar.weather_production[:, None, None]
+        self._day_max_targets = np.minimum(
+            self._socs + np.floor(self._day_productions), max_socs
+        ).astype(np.int64)
+        self._night_max_targets = np.minimum(self._socs, max_socs)[None].astype(
+            np.int64
+        )
+        # midpoints of `n_price_levels` equiprobable bins of the uniform sell price noise
+        self._price_levels = 1 + 0.2 * (
+            -1 + (2 * np.arange(n_price_levels) + 1) / n_price_levels
+        )
+
+    @property
+    def is_solved(self) -> bool:
+        return self._checkpoints is not None
+
+    def solve(self) -> None:
+        """Run the backward induction from the end of the episode, keeping the checkpoints."""
+        values = np.zeros(self._safe_targets.shape)
+        self._checkpoints = {self._horizon: values}
+        for timestep in reversed(range(self._horizon)):
+            values = self._backup(timestep, values)
+            if timestep % self._checkpoint_interval == 0:
+                self._checkpoints[timestep] = values
+        self._blocks.clear()
+
+    def values(self, timestep: int) -> np.ndarray:
+        """The expected return from `timestep` on, by capacity level and state of charge."""
+        if timestep >= self._horizon:
+            return self._checkpoints[self._horizon]
+        start = timestep - timestep % self._checkpoint_interval
+        if start in self._blocks:
+            self._blocks.move_to_end(start)
+        else:
+            end = min(start + self._checkpoint_interval, self._horizon)
+            block = np.empty((end - start, *self._safe_targets.shape))
+            values = self._checkpoints[end]
+            for t in reversed(range(start, end)):
+                values = block[t - start] = self._backup(t, values)
+            self._blocks[start] = block
+            if (
+                self._n_cached_blocks is not None
+                and len(self._blocks) > self._n_cached_blocks
+            ):
+                self._blocks.popitem(last=False)
+        return self._blocks[start][timestep - start]
+
+    def action_values(
+        self,
+        timestep: int,
+        state_of_charge: float,
+        battery_capacity: float,
+        production: float,
+        sell_price: float,
+        charge_amounts: np.ndarray,
+    ) -> np.ndarray:
+        """The reward plus the expected return of the next timestep of every charge amount."""
+        next_values = self.values(timestep + 1)
+        k = math.log(battery_capacity / self._init_capacity) / math.log(
+            self._degradation_factor
+        )
+        targets = state_of_charge + charge_amounts
+        target_indices = np.clip(targets, 0, len(self._socs) - 1).astype(np.int64)
+        low, high = self.env_config.battery_safe_range_ratios
+        next_capacity = battery_capacity * self._degradation_factor
+        unsafe = (targets < low * next_capacity) | (targets > high * next_capacity)
+        safe_values = (production - charge_amounts) * sell_price / self._max_reward
+        safe_values += self._interpolate(next_values, k + 1)[target_indices]
+        unsafe_values = (
+            _UNSAFE_REWARD
+            + self._interpolate(next_values, k + self._k_unsafe)[target_indices]
+        )
+        return np.where(unsafe, unsafe_values, safe_values)
+
+    def save(self, path: Path) -> None:
+        timesteps = sorted(self._checkpoints)
+        np.savez(
+            path,
+            timesteps=timesteps,
+            values=np.stack([self._checkpoints[t] for t in timesteps]),
+        )
+
+    def load(self, path: Path) -> None:
+        with np.load(path) as data:
+            self._checkpoints = dict(zip(data["timesteps"].tolist(), data["values"]))
+        self._blocks.clear()
+
+    def _interpolate(self, values: np.ndarray, k: float) -> np.ndarray:
+        """The values at the degradation `k`, zero from the termination capacity on."""
+        level, fraction = divmod(k / self._k_level, 1)
+        level = int(level)
+        if level >= len(values):
+            return np.zeros(values.shape[1])
+        upper = values[level + 1] if level + 1 < len(values) else 0.0
+        return (1 - fraction) * values[level] + fraction * upper
+
+    def _backup(self, timestep: int, next_values: np.ndarray) -> np.ndarray:
+        """The values of `timestep` given the values of the next one."""
+        timestep_of_year = self._calendar.timestep_of_year(timestep)
+        sell_prices = self._calendar.price[timestep_of_year] * self._price_levels
+        if self._calendar.is_dark_hours[timestep_of_year]:
+            weather_probabilities = np.ones(1)
+            productions, max_targets = np.zeros((1, 1, 1)), self._night_max_targets
+        else:
+            season = self._calendar.season[timestep_of_year]
+            weather_probabilities = self._calendar.weather_probabilities[season]
+            productions, max_targets = self._day_productions, self._day_max_targets
+
+        # the continuation values of the next degradation, zero from the termination on
+        next_values = np.concatenate([next_values, np.zeros((1, next_values.shape[1]))])
+        safe_continuation = self._shift(next_values, 1)
+        unsafe_continuation = self._shift(next_values, self._k_unsafe)
+
+        # the best target up to each state of charge, the safe rewards are
+        # `(production + soc - target) * sell price` so the target part is separable
+        prices = sell_prices[:, None, None] / self._max_reward
+        safe = np.where(
+            self._safe_targets, safe_continuation - self._socs * prices, -np.inf
+        )
+        unsafe = np.where(
+            self._unsafe_targets, _UNSAFE_REWARD + unsafe_continuation, -np.inf
+        )
+        best_safe = np.maximum.accumulate(safe, axis=-1)
+        best_unsafe = np.maximum.accumulate(unsafe, axis=-1)
+
+        # by weather, price level, capacity level and state of charge
+        safe_values = (productions + self._socs)[:, None] * prices + np.take_along_axis(
+            best_safe[None], max_targets[:, None], axis=-1
+        )
+        unsafe_values = np.take_along_axis(best_unsafe[None], max_targets, axis=-1)[
+            :, None
+        ]
+        values = np.maximum(safe_values, unsafe_values).mean(axis=1)
+        return np.tensordot(weather_probabilities, values, axes=1)
+
+    def _shift(self, values: np.ndarray, k: float) -> np.ndarray:
+        """The values of every capacity level after a degradation of `k < k_level`."""
+        fraction = k / self._k_level
+        return (1 - fraction) * values[:-1] + fraction * values[1:]
+
+# %% ../nbs/08_dynamic_programming.ipynb 6
+def perfect_foresight_rewards(
+    env_config: EnvConfig | None, seeds: list[int]
+) -> np.ndarray:
+    """
+    The best episode reward of every seed, knowing its weather, sell prices and demands in advance.
+
+    The oracle plans over the episodes whose steps are all valid and in the safe range, their
+    rewards are non-negative while an invalid or unsafe step is rewarded -1 or -0.8. The battery
+    capacity of such an episode only depends on the timestep, so all the seeds are solved at once
+    with a forward pass over the states of charge.
+    """
+    returns, _ = _perfect_foresight(env_config or EnvConfig(), seeds)
+    return returns.max(axis=1)
+
+
+def perfect_foresight_actions(env_config: EnvConfig | None, seed: int) -> np.ndarray:
+    """The actions of the best episode of `seed`, see `perfect_foresight_rewards`."""
+    config = env_config or EnvConfig()
+    returns, sources = _perfect_foresight(config, [seed], keep_sources=True)
+    scenario = get_scenario(config, seed)
+    action_values = np.arange(
+        -config.init_battery_capacity, config.init_battery_capacity + 1.0
+    )
+    actions = np.empty(len(sources), dtype=np.int64)
+    state_of_charge = int(np.argmax(returns[0]))
+    for timestep in reversed(range(len(sources))):
+        source = sources[timestep][state_of_charge]
+        # the first action of the charge, as `ElectricityMarketEnv._charge_amounts`
+        charge_amounts = np.ceil(
+            action_values - scenario.demand_of_electricity[timestep]
+        )
+        actions[timestep] = np.flatnonzero(charge_amounts == state_of_charge - source)[
+            0
+        ]
+        state_of_charge = source
+    return actions
+
+
+def _perfect_foresight(
+    config: EnvConfig, seeds: list[int], keep_sources: bool = False
+) -> tuple[np.ndarray, list]:
+    """
+    The best returns of the seeds by final state of charge, and with `keep_sources` the best
+    previous state of charge of the first seed by timestep and state of charge.
+    """
+    env = ElectricityMarketEnv(replace(config, max_timestep=0, record_trajectory=False))
+    scenarios = [get_scenario(config, seed) for seed in seeds]
+    productions = np.stack([scenario.production for scenario in scenarios])
+    sell_prices = np.stack([scenario.sell_price for scenario in scenarios])
+    demands = np.stack([scenario.demand_of_electricity for scenario in scenarios])
+
+    # the capacity at every timestep, degraded as `ElectricityMarketEnv.step` does
+    capacities = np.multiply.accumulate(
+        np.r_[
+            float(config.init_battery_capacity),
+            np.full(config.max_timestep + 1, config.battery_degradation_factor),
+        ]
+    )
+    # the episode ends after the step of `max_timestep` or of the termination capacity
+    is_last = capacities[:-1] <= env._min_battery_capacity
+    is_last[-1] = True
+    n_steps = int(np.argmax(is_last)) + 1
+
+    socs = np.arange(math.floor(config.init_battery_capacity) + 1)
+    low, high = config.battery_safe_range_ratios
+    returns = np.full((len(seeds), len(socs)), -np.inf)
+    returns[:, config.init_state_of_charge] = 0.0
+    sources = []
+    for timestep in range(n_steps):
+        production = productions[:, timestep, None]
+        sell_price = sell_prices[:, timestep, None] / env._max_reward
+        # the highest charge of the action range, as `ElectricityMarketEnv._charge_amounts`
+        max_charges = np.minimum(
+            np.floor(production),
+            np.ceil(config.init_battery_capacity - demands[:, timestep, None]),
+        )
+        # charging `target - soc` is rewarded `(production - target + soc) * sell price`, so
+        # the best source of a target is the suffix maximum from its lowest source
+        source_values = returns + socs * sell_price
+        best_sources = np.maximum.accumulate(source_values[:, ::-1], axis=1)[:, ::-1]
+        lowest_sources = np.clip(socs - max_charges, 0, None).astype(np.int64)
+        targets_returns = (production - socs) * sell_price + np.take_along_axis(
+            best_sources, lowest_sources, axis=1
+        )
+        next_capacity = capacities[timestep + 1]
+        is_allowed = (
+            (socs <= capacities[timestep])
+            & (socs >= low * next_capacity)
+            & (socs <= high * next_capacity)
+        )
+        if keep_sources:
+            sources.append(_suffix_argmax(source_values[0])[lowest_sources[0]])
+        returns = np.where(is_allowed, targets_returns, -np.inf)
+    return returns, sources
+
+
+def _suffix_argmax(values: np.ndarray) -> np.ndarray:
+    """The index of the maximum of `values[i:]` for every `i`."""
+    reversed_values = values[::-1]
+    is_maximum = reversed_values == np.maximum.accumulate(reversed_values)
+    last_maximum = np.maximum.accumulate(
+        np.where(is_maximum, np.arange(len(values)), 0)
+    )
+    return (len(values) - 1 - last_maximum)[::-1]
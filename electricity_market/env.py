@@ -3,24 +3,21 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_env.ipynb.
 
 # %% auto 0
-__all__ = ['WEATHER_PROBABILITIES_MAP_PER_SEASON', 'Season', 'Weather', 'EnvConfig', 'ElectricityMarketEnv']
+__all__ = ['WEATHER_PROBABILITIES_MAP_PER_SEASON', 'Season', 'Weather', 'EnvConfig', 'Scenario', 'Trajectory', 'EnvState',
+           'Calendar', 'get_calendar', 'get_scenario', 'ElectricityMarketEnv']
 
 # %% ../nbs/00_env.ipynb 3
 import math
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from io import BytesIO
+from pathlib import Path
 
 import gymnasium as gym
 import numpy as np
-import torch
 from gymnasium.core import RenderFrame
 from gymnasium.envs.registration import register
-from matplotlib import pyplot as plt
-from PIL import Image
-from sb3_contrib.common.wrappers import ActionMasker
-from stable_baselines3.common.env_checker import check_env
-from stable_baselines3.common.monitor import Monitor
 
 # %% ../nbs/00_env.ipynb 4
 class Season(Enum):
@@ -56,7 +53,7 @@ WEATHER_PROBABILITIES_MAP_PER_SEASON = {
 }
 
 # %% ../nbs/00_env.ipynb 5
-@dataclass
+@dataclass(frozen=True)
 class EnvConfig:
     max_timestep: int = 365 * 6 * 8  # default: 8 year in timesteps
     init_battery_capacity: int = 250  # default: 25 kWh
@@ -74,9 +71,314 @@ class EnvConfig:
     # degradation when unsafe is 10 time faster
     battery_unsafe_degradation_exponent: int = 10
     battery_capacity_ratio_for_termination: float = 0.2
+    # record the episode trajectory for `render` and `trajectory`
+    record_trajectory: bool = True
+    # a `.npy` file or a directory of `.npy` shards of historical data, instead of
+    # synthesized scenarios, see `get_scenario`
+    historical_data_path: str | None = None
 
 # %% ../nbs/00_env.ipynb 6
+@dataclass(frozen=True)
+class Scenario:
+    """The exogenous weather, production, sell price and demand of every timestep of an episode."""
+
+    # index into `(Weather.SUNNY, Weather.CLOUDY, Weather.PARTIAL_CLOUDY)`
+    weather: np.ndarray
+    production: np.ndarray
+    sell_price: np.ndarray
+    demand_of_electricity: np.ndarray
+
+# %% ../nbs/00_env.ipynb 7
+@dataclass(frozen=True)
+class Trajectory:
+    """The observations, actions and rewards recorded during an episode."""
+
+    # `len(actions) + 1` observations, the first one is returned by `reset`
+    observations: np.ndarray
+    actions: np.ndarray
+    rewards: np.ndarray
+
+# %% ../nbs/00_env.ipynb 8
+@dataclass(frozen=True)
+class EnvState:
+    """The dynamic state of an environment, see `ElectricityMarketEnv.get_state`."""
+
+    timestep: int
+    state_of_charge: float
+    battery_capacity: float
+    # the weather, production, sell price and demand are read from the scenario at `timestep`
+    scenario: Scenario
+    # state of the bit generator of `np_random`, which draws unseeded scenarios
+    rng_state: dict
+    # the episode ended at the step that reached this state, as the `done` of `step`
+    done: bool = False
+
+# %% ../nbs/00_env.ipynb 9
+# each timestep is 4 hours
+_TIMESTEPS_IN_DAY = 24 // 4
+_DAYS_IN_YEAR = 365
+_DAYS_IN_SEASON = 92
+_TIMESTEPS_IN_YEAR = _TIMESTEPS_IN_DAY * _DAYS_IN_YEAR
+# seasons ordered by `day_of_year // days_in_season`, as in `ElectricityMarketEnv._season`
+_SEASONS = (Season.WINTER, Season.SPRING, Season.SUMMER, Season.FALL)
+_HIGH_DEMAND_SEASONS = np.array(
+    [season in (Season.WINTER, Season.SUMMER) for season in _SEASONS]
+)
+_WEATHERS = (Weather.SUNNY, Weather.CLOUDY, Weather.PARTIAL_CLOUDY)
+_WEATHER_PRODUCTION_RATIOS = np.array([1.0, 0.4, 0.7])
+_WEATHER_CDF_PER_SEASON = np.cumsum(
+    [
+        [WEATHER_PROBABILITIES_MAP_PER_SEASON[season][weather] for weather in _WEATHERS]
+        for season in _SEASONS
+    ],
+    axis=1,
+)
+_WEATHER_CDF_PER_SEASON /= _WEATHER_CDF_PER_SEASON[:, -1:]
+
+
+def _season_indices(timesteps: np.ndarray) -> np.ndarray:
+    day_of_year = (timesteps // _TIMESTEPS_IN_DAY) % _DAYS_IN_YEAR + 1
+    return day_of_year // _DAYS_IN_SEASON
+
+
+def _is_dark_hours(timesteps: np.ndarray) -> np.ndarray:
+    # assuming night is 20:00-08:00 (dark hours)
+    return timesteps % _TIMESTEPS_IN_DAY < 2
+
+
+def _uniform(half_width: np.ndarray, probs: np.ndarray) -> np.ndarray:
+    # same as `np.random.uniform(-half_width, half_width)` given uniform `probs`
+    return -half_width + (half_width - -half_width) * probs
+
+
+@dataclass(frozen=True)
+class Calendar:
+    """
+    Lookup tables indexed by the timestep of the year, and the draws of the weather, production,
+    sell price and demand of timesteps from them, see `get_calendar`.
+
+    The draws are given a uniform probability per value, a scenario draws a value per timestep
+    and `ElectricityMarketFleetEnv` a value per site.
+    """
+
+    # index into `_SEASONS`
+    season: np.ndarray
+    is_dark_hours: np.ndarray
+    # sell price and demand before noise
+    price: np.ndarray
+    demand_of_electricity: np.ndarray
+    # the probabilities of the weathers in every season, and the production of every
+    # weather in daylight, indexed like `Scenario.weather`
+    weather_probabilities: np.ndarray
+    weather_production: np.ndarray
+
+    @staticmethod
+    def timestep_of_year(timesteps: np.ndarray) -> np.ndarray:
+        return timesteps % _TIMESTEPS_IN_YEAR
+
+    def draw_weather(self, timesteps: np.ndarray, probs: np.ndarray) -> np.ndarray:
+        seasons = self.season[self.timestep_of_year(timesteps)]
+        return np.count_nonzero(
+            _WEATHER_CDF_PER_SEASON[seasons] <= probs[..., None], axis=-1
+        ).astype(np.int8)
+
+    def production(self, timesteps: np.ndarray, weather: np.ndarray) -> np.ndarray:
+        # Solar panels doesn't produce at night, and produce less on cloudy days
+        return np.where(
+            self.is_dark_hours[self.timestep_of_year(timesteps)],
+            0.0,
+            self.weather_production[weather],
+        )
+
+    def draw_sell_price(self, timesteps: np.ndarray, probs: np.ndarray) -> np.ndarray:
+        price = self.price[self.timestep_of_year(timesteps)]
+        return price + _uniform(price * 0.2, probs)
+
+    def draw_demand(self, timesteps: np.ndarray, probs: np.ndarray) -> np.ndarray:
+        demand = self.demand_of_electricity[self.timestep_of_year(timesteps)]
+        return demand + _uniform(0.2 * demand, probs)
+
+
+@lru_cache(maxsize=16)
+def get_calendar(env_config: EnvConfig) -> Calendar:
+    """The `Calendar` of a config, shared by every environment of the config."""
+    timesteps = np.arange(_TIMESTEPS_IN_YEAR)
+    seasons = _season_indices(timesteps)
+    is_dark_hours = _is_dark_hours(timesteps)
+    is_high_demand_season = _HIGH_DEMAND_SEASONS[seasons]
+    price = (
+        env_config.base_price
+        * np.where(is_dark_hours, env_config.night_price_factor, 1.0)
+        * np.where(
+            is_high_demand_season, env_config.high_demand_seasons_price_factor, 1.0
+        )
+    )
+    demand = (
+        env_config.base_demand_of_electricity
+        * np.where(
+            is_high_demand_season, env_config.high_demand_seasons_demand_factor, 1.0
+        )
+        * np.where(is_dark_hours, env_config.night_demand_factor, 1.0)
+    )
+    weather_probabilities = np.diff(_WEATHER_CDF_PER_SEASON, prepend=0.0, axis=1)
+    weather_production = env_config.production_capacity * _WEATHER_PRODUCTION_RATIOS
+    tables = (
+        seasons,
+        is_dark_hours,
+        price,
+        demand,
+        weather_probabilities,
+        weather_production,
+    )
+    for table in tables:
+        table.setflags(write=False)
+    return Calendar(*tables)
+
+
+_HISTORICAL_FIELDS = ("production", "sell_price", "demand_of_electricity")
+
+
+@lru_cache(maxsize=4)
+def _load_historical_data(path: str) -> tuple[np.ndarray, ...]:
+    """Memory-maps the `.npy` file at `path`, or the `.npy` shards of the directory in name order."""
+    shard_paths = sorted(Path(path).glob("*.npy")) if Path(path).is_dir() else [path]
+    if not shard_paths:
+        raise ValueError(f"no .npy shards in {path}")
+    shards = tuple(np.load(shard_path, mmap_mode="r") for shard_path in shard_paths)
+    for shard_path, shard in zip(shard_paths, shards):
+        missing_fields = set(_HISTORICAL_FIELDS) - set(shard.dtype.names or ())
+        if missing_fields:
+            raise ValueError(f"{shard_path} misses the fields {sorted(missing_fields)}")
+    return shards
+
+
+def _historical_window(shards: tuple[np.ndarray, ...], start: int, length: int):
+    """The timesteps `start` to `start + length` of the shards, only copied if they span shards."""
+    shard_starts = np.cumsum([0] + [len(shard) for shard in shards])
+    first = int(np.searchsorted(shard_starts, start, side="right")) - 1
+    if start + length <= shard_starts[first + 1]:
+        return shards[first][start - shard_starts[first] :][:length]
+    last = int(np.searchsorted(shard_starts, start + length, side="left")) - 1
+    window = np.concatenate(
+        [
+            shard[max(start - shard_start, 0) : start + length - shard_start]
+            for shard, shard_start in zip(
+                shards[first : last + 1], shard_starts[first : last + 1]
+            )
+        ]
+    )
+    window.setflags(write=False)
+    return window
+
+
+def _historical_scenario(
+    env_config: EnvConfig, seed_sequence: np.random.SeedSequence
+) -> Scenario:
+    """
+    Reads an episode of the historical data from a random whole day, without loading the rest.
+    """
+    shards = _load_historical_data(env_config.historical_data_path)
+    # an episode observes the timesteps 0 to `max_timestep + 1`
+    length = env_config.max_timestep + 2
+    n_days = (sum(len(shard) for shard in shards) - length) // _TIMESTEPS_IN_DAY + 1
+    if n_days < 1:
+        raise ValueError(
+            f"the historical data is shorter than an episode of {length} timesteps"
+        )
+    # starting on a whole day keeps the dark hours of the calendar
+    start = _TIMESTEPS_IN_DAY * int(
+        np.random.default_rng(seed_sequence).integers(n_days)
+    )
+    window = _historical_window(shards, start, length)
+    if "weather" in window.dtype.names:
+        weather = window["weather"]
+    else:
+        # the weather whose production ratio is the closest
+        production_ratios = window["production"] / env_config.production_capacity
+        weather = (
+            np.abs(production_ratios[:, None] - _WEATHER_PRODUCTION_RATIOS)
+            .argmin(axis=1)
+            .astype(np.int8)
+        )
+        weather.setflags(write=False)
+    return Scenario(weather, *(window[field] for field in _HISTORICAL_FIELDS))
+
+
+def _generate_scenario(
+    env_config: EnvConfig, seed_sequence: np.random.SeedSequence
+) -> Scenario:
+    """Draws the weather, sell price and demand of a whole episode at once."""
+    if env_config.historical_data_path is not None:
+        return _historical_scenario(env_config, seed_sequence)
+    calendar = get_calendar(env_config)
+    # an episode observes the timesteps 0 to `max_timestep + 1`
+    timesteps = np.arange(env_config.max_timestep + 2)
+    # independent streams, so each series doesn't depend on how the others are drawn
+    weather_probs, price_probs, demand_probs = [
+        np.random.default_rng(child).random(len(timesteps))
+        for child in seed_sequence.spawn(3)
+    ]
+
+    weather = calendar.draw_weather(timesteps, weather_probs)
+    production = calendar.production(timesteps, weather)
+    sell_price = calendar.draw_sell_price(timesteps, price_probs)
+    demand_of_electricity = calendar.draw_demand(timesteps, demand_probs)
+
+    scenario = Scenario(weather, production, sell_price, demand_of_electricity)
+    # scenarios are cached and shared between environments
+    for table in (weather, production, sell_price, demand_of_electricity):
+        table.setflags(write=False)
+    return scenario
+
+
+@lru_cache(maxsize=64)
+def _get_seeded_scenario(env_config: EnvConfig, seed: int) -> Scenario:
+    return _generate_scenario(env_config, np.random.SeedSequence(seed))
+
+
+# about one bucket per horizontal pixel of a rendered subplot
+_RENDER_BUCKETS = 500
+
+
+def _decimate(values: np.ndarray, n_buckets: int = _RENDER_BUCKETS) -> tuple:
+    """Downsamples a series to the min and max of each bucket, so peaks stay visible."""
+    timesteps = np.arange(len(values))
+    if len(values) <= 2 * n_buckets:
+        return timesteps, values
+    starts = np.linspace(0, len(values), n_buckets, endpoint=False).astype(np.int64)
+    decimated = np.empty(2 * n_buckets, dtype=values.dtype)
+    decimated[0::2] = np.minimum.reduceat(values, starts)
+    decimated[1::2] = np.maximum.reduceat(values, starts)
+    return np.repeat(starts, 2), decimated
+
+# %% ../nbs/00_env.ipynb 10
+def get_scenario(
+    env_config: EnvConfig,
+    seed: int | None = None,
+    np_random: np.random.Generator | None = None,
+) -> Scenario:
+    """
+    Returns the scenario of an episode, seeded scenarios are generated once and
+    shared by every environment reset with the same seed and config. Unseeded
+    scenarios are drawn from `np_random`, or from fresh entropy if not given.
+
+    With `historical_data_path`, the scenario is a window of the historical data starting
+    on a random day instead. The data is a structured `.npy` array, or a directory of
+    `.npy` shards in name order, with a row per timestep and the `production`,
+    `sell_price` and `demand_of_electricity` fields, and optionally `weather`. The data
+    is memory-mapped, so a window is only read as it is stepped and the page cache is
+    shared by every process. A window only copies its timesteps when it spans shards.
+    The observations and rewards are still normalized by the scales of the config.
+    """
+    if seed is None:
+        entropy = None if np_random is None else np_random.integers(2**63)
+        return _generate_scenario(env_config, np.random.SeedSequence(entropy))
+    return _get_seeded_scenario(env_config, seed)
+
+# %% ../nbs/00_env.ipynb 11
 class ElectricityMarketEnv(gym.Env):
+    metadata = {"render_modes": ["human", "rgb_array"]}
+
     def __init__(
         self, env_config: EnvConfig | None = None, render_mode: str | None = None
     ):
@@ -84,9 +386,9 @@ class ElectricityMarketEnv(gym.Env):
             env_config = EnvConfig()
         self._config = env_config
         self.render_mode = render_mode
+        self._render_figure = None
         # each timestep is 4 hours
         self._timestep_duration_in_hours = 4
-        self._episode_obs: list = []
         self._timestep = 0
         # Decided On granularity of 100 Wh
         self._battery_capacity = self._config.init_battery_capacity
@@ -116,11 +418,39 @@ class ElectricityMarketEnv(gym.Env):
 
         self._battery_safe_range_ratios = self._config.battery_safe_range_ratios
 
-        self.__weather = self._get_weather()
-        self.__sell_price = self._get_sell_price()
-        self.__demand_of_electricity = self._get_demand_of_electricity()
+        self._calendar = get_calendar(self._config)
+        self._min_electricity_demand = self._base_demand_of_electricity * 0.8
+        self._max_demand_of_electricity = (
+            self._base_demand_of_electricity
+            * self._high_demand_seasons_demand_factor
+            * self._night_demand_factor
+            * 1.2
+        )
+        # base price in dark hours in winter/summer with max noise
+        self._max_price = (
+            self._base_price
+            * self._night_price_factor
+            * self._high_demand_seasons_price_factor
+            * 1.2
+        )
+        # max reward is not reachable, it only normalizes the rewards
+        self._max_reward = self._max_price * (
+            self._config.init_battery_capacity
+            + self._production_capacity
+            - self._min_electricity_demand
+        )
+        self._min_battery_capacity = (
+            self._config.init_battery_capacity
+            * self._battery_capacity_ratio_for_termination
+        )
+        self._unsafe_battery_degradation_factor = (
+            self._battery_degradation_factor**self._battery_unsafe_degradation_exponent
+        )
+
+        self._scenario = get_scenario(self._config, np_random=self.np_random)
         self.action_space = gym.spaces.Discrete(2 * self._battery_capacity + 1)
         self.actions = list(range(-self._battery_capacity, self._battery_capacity + 1))
+        self._action_values = np.array(self.actions, dtype=np.float64)
         self.observation_space = gym.spaces.Box(
             low=np.array([0, 0, 0, 0, 0, 0, 0, 0]),
             high=np.array(
@@ -147,12 +477,29 @@ class ElectricityMarketEnv(gym.Env):
             dtype=np.float64,
         )
 
+        # an episode observes the timesteps 0 to `max_timestep + 1`
+        self._episode_length = 0
+        # `step` needs a `reset` first, and again once the episode is over
+        self._needs_reset = True
+        if self._config.record_trajectory:
+            self._episode_observations = np.zeros(
+                (self._max_timestep + 2, *self.observation_space.shape),
+                dtype=np.float64,
+            )
+            self._episode_actions = np.zeros(self._max_timestep + 1, dtype=np.int64)
+            self._episode_rewards = np.zeros(self._max_timestep + 1, dtype=np.float64)
+
     def _charge_amount(self, action: int) -> int:
         return math.ceil(self.actions[action] - self._demand_of_electricity)
 
     def _electricity_leftover(self, action: int) -> float:
         return self._production - self._charge_amount(action)
 
+    def _charge_amounts(self) -> np.ndarray:
+        """`_charge_amount` of every action at once."""
+        charge_amounts = self._action_values - self._demand_of_electricity
+        return np.ceil(charge_amounts, out=charge_amounts)
+
     def _is_action_valid(self, action: int) -> bool:
         charge_amount = self._charge_amount(action)
         if charge_amount > self._production:
@@ -162,94 +509,82 @@ class ElectricityMarketEnv(gym.Env):
 
     @property
     def _is_done(self):
-        return (
-            self._battery_capacity
-            <= self._config.init_battery_capacity
-            * self._battery_capacity_ratio_for_termination
-        )
+        return self._battery_capacity <= self._min_battery_capacity
 
     def step(self, action: int) -> tuple:
+        if self._needs_reset:
+            raise RuntimeError(
+                "`step` was called before `reset` or after the end of the episode"
+            )
         charge_amount = self._charge_amount(action)
         truncated = self._timestep >= self._max_timestep
         done = self._is_done or truncated
+        self._needs_reset = done
 
         if not self._is_action_valid(action):
             reward = -1
             self._timestep += 1
-            self.__weather = self._get_weather()
-            self.__sell_price = self._get_sell_price()
-            self.__demand_of_electricity = self._get_demand_of_electricity()
             observations = self._get_obs()
-            self._episode_obs.append(observations)
+            self._record(observations, action, reward)
             return observations, reward, done, truncated, {}
 
         self._current_state_of_charge += charge_amount
         self._battery_capacity *= self._battery_degradation_factor
         # if violated the safe range, extra degradation
         if self._is_safe_range_violation:
-            self._battery_capacity *= (
-                self._battery_degradation_factor
-                ** self._battery_unsafe_degradation_exponent
-            )
+            self._battery_capacity *= self._unsafe_battery_degradation_factor
         reward = self._reward(action)
         self._timestep += 1
-        self.__weather = self._get_weather()
-        self.__sell_price = self._get_sell_price()
-        self.__demand_of_electricity = self._get_demand_of_electricity()
         observations = self._get_obs()
-        self._episode_obs.append(observations)
+        self._record(observations, action, reward)
         return observations, reward, done, truncated, {}
 
-    def _get_weather(self) -> Weather:
-        options, probs = zip(
-            *WEATHER_PROBABILITIES_MAP_PER_SEASON[self._season].items()
+    def _record(self, observations: np.ndarray, action=None, reward=None) -> None:
+        """Writes a step of the episode into the trajectory buffers."""
+        if not self._config.record_trajectory:
+            return
+        if action is not None:
+            self._episode_actions[self._episode_length - 1] = action
+            self._episode_rewards[self._episode_length - 1] = reward
+        self._episode_observations[self._episode_length] = observations
+        self._episode_length += 1
+
+    @property
+    def trajectory(self) -> Trajectory | None:
+        """Read-only views of the current episode, `None` if recording is off.
+
+        The views share memory with the recorder, so they are overwritten by the next `reset`.
+        """
+        if not self._config.record_trajectory:
+            return None
+        views = (
+            self._episode_observations[: self._episode_length],
+            self._episode_actions[: self._episode_length - 1],
+            self._episode_rewards[: self._episode_length - 1],
         )
-        return np.random.choice(options, p=probs)
+        for view in views:
+            view.flags.writeable = False
+        return Trajectory(*views)
 
     @property
     def _weather(self) -> Weather:
-        return self.__weather
+        return _WEATHERS[self._scenario.weather[self._timestep]]
+
+    @property
+    def _timestep_of_year(self) -> int:
+        return self._timestep % _TIMESTEPS_IN_YEAR
 
     @property
     def _is_dark_hours(self) -> bool:
-        # assuming night is 20:00-08:00 (dark hours)
-        return self._timestep % 6 < 2 or self._timestep % 6 > 5
+        return self._calendar.is_dark_hours[self._timestep_of_year]
 
     @property
     def _season(self) -> Season:
-        days_in_year = 365
-        hours_in_day = 24
-        number_of_seasons = 4
-        timesteps_in_day = hours_in_day / self._timestep_duration_in_hours
-        day_of_year = (self._timestep // timesteps_in_day) % days_in_year + 1
-        days_in_season = math.ceil(days_in_year / number_of_seasons)
-        match day_of_year // days_in_season:
-            case 0:
-                return Season.WINTER
-            case 1:
-                return Season.SPRING
-            case 2:
-                return Season.SUMMER
-            case 3:
-                return Season.FALL
-            case _:
-                raise ValueError(f"{days_in_season=} {day_of_year=}")
+        return _SEASONS[self._calendar.season[self._timestep_of_year]]
 
     @property
     def _production(self) -> float:
-        # Solar panels doesn't produce at night.
-        if self._is_dark_hours:
-            return 0
-        # Solar panels doesn't produce well on cloudy days
-        match self._weather:
-            case Weather.SUNNY:
-                return self._production_capacity
-            case Weather.CLOUDY:
-                return self._production_capacity * 0.4
-            case Weather.PARTIAL_CLOUDY:
-                return self._production_capacity * 0.7
-            case _:
-                raise ValueError("Weather not supported")
+        return self._scenario.production[self._timestep]
 
     def _reward(self, action) -> float:
         # penalty for violating the safe range
@@ -258,41 +593,14 @@ class ElectricityMarketEnv(gym.Env):
         sell_amount = self._electricity_leftover(action)
         if sell_amount < 0:
             return -0.5
-        max_reward = self._max_price * (
-            self._config.init_battery_capacity
-            + self._production_capacity
-            - self._min_electricity_demand
-        )
         reward = sell_amount * self._sell_price
         # normalize (max reward is not reachable)
-        normalized_reward = reward / max_reward
+        normalized_reward = reward / self._max_reward
         return normalized_reward
 
     @property
     def _demand_of_electricity(self) -> float:
-        return self.__demand_of_electricity
-
-    @property
-    def _min_electricity_demand(self) -> float:
-        return self._base_demand_of_electricity * 0.8
-
-    @property
-    def _max_demand_of_electricity(self) -> float:
-        return (
-            self._base_demand_of_electricity
-            * self._high_demand_seasons_demand_factor
-            * self._night_demand_factor
-            * 1.2
-        )
-
-    def _get_demand_of_electricity(self) -> float:
-        demand = self._base_demand_of_electricity
-        if self._season in (Season.SUMMER, Season.WINTER):
-            demand *= self._high_demand_seasons_demand_factor
-        if self._is_dark_hours:
-            demand *= self._night_demand_factor
-        noise = np.random.uniform(-0.2 * demand, 0.2 * demand)
-        return demand + noise
+        return self._scenario.demand_of_electricity[self._timestep]
 
     @property
     def _is_safe_range_violation(self) -> bool:
@@ -306,59 +614,139 @@ class ElectricityMarketEnv(gym.Env):
         low, high = self._battery_safe_range_ratios
         return low * self._battery_capacity, high * self._battery_capacity
 
-    @property
-    def _max_price(self) -> float:
-        # base price in dark hours in winter/summer with max noise
-        return (
-            self._base_price
-            * self._night_price_factor
-            * self._high_demand_seasons_price_factor
-            * 1.2
-        )
-
-    def _get_sell_price(self) -> float:
-        price = self._base_price
-        if self._is_dark_hours:
-            price *= self._night_price_factor
-        if self._season in (Season.WINTER, Season.SUMMER):
-            price *= self._high_demand_seasons_price_factor
-        noise = np.random.uniform(-price * 0.2, price * 0.2)
-        return price + noise
-
     @property
     def _sell_price(self) -> float:
-        return self.__sell_price
+        return self._scenario.sell_price[self._timestep]
 
     def reset(self, *, seed: int | None = None, options: dict | None = None):
         """Resets the environment to the initial state."""
-        np.random.seed(seed)
-        if seed is not None:
-            torch.manual_seed(seed)
         super().reset(seed=seed, options=options)
         self._timestep = 0
         self._current_state_of_charge = self._init_state_of_charge
         self._battery_capacity = self._config.init_battery_capacity
-        np.random.seed(seed)
-        self.__weather = self._get_weather()
-        self.__sell_price = self._get_sell_price()
-        self.__demand_of_electricity = self._get_demand_of_electricity()
+        self._scenario = get_scenario(self._config, seed, self.np_random)
         observations = self._get_obs()
-        self._episode_obs = [observations]
+        self._episode_length = 0
+        self._needs_reset = False
+        self._record(observations)
         return observations, {}
 
+    def get_state(self) -> EnvState:
+        """
+        A snapshot of the dynamic state, for lookahead planning with `set_state` and `rollout`.
+
+        The scenario is shared, not copied, so a snapshot is cheap to take.
+        """
+        return EnvState(
+            self._timestep,
+            self._current_state_of_charge,
+            self._battery_capacity,
+            self._scenario,
+            self.np_random.bit_generator.state,
+            self._needs_reset,
+        )
+
+    def set_state(self, state: EnvState) -> None:
+        """
+        Restores a snapshot of `get_state`.
+
+        The trajectory is cut back to the timestep of the snapshot, it only describes the
+        episode if the snapshot was taken from the same episode.
+        """
+        self._timestep = state.timestep
+        self._current_state_of_charge = state.state_of_charge
+        self._battery_capacity = state.battery_capacity
+        self._scenario = state.scenario
+        self.np_random.bit_generator.state = state.rng_state
+        self._episode_length = state.timestep + 1
+        self._needs_reset = state.done or state.timestep > self._max_timestep
+
+    def rollout(self, state: EnvState, action_sequences: np.ndarray) -> np.ndarray:
+        """
+        The rewards of every row of `action_sequences` played from `state`, the environment is unchanged.
+
+        The sequences are stepped together with array operations, following the rules of `step`.
+        The rewards after the end of an episode are 0.
+        """
+        action_sequences = np.atleast_2d(action_sequences)
+        n_sequences, horizon = action_sequences.shape
+        scenario = state.scenario
+        state_of_charge = np.full(n_sequences, state.state_of_charge, dtype=np.float64)
+        battery_capacity = np.full(
+            n_sequences, state.battery_capacity, dtype=np.float64
+        )
+        running = np.full(n_sequences, not state.done)
+        rewards = np.zeros((n_sequences, horizon), dtype=np.float64)
+        low_ratio, high_ratio = self._battery_safe_range_ratios
+
+        def is_safe_range_violation() -> np.ndarray:
+            return (state_of_charge < low_ratio * battery_capacity) | (
+                state_of_charge > high_ratio * battery_capacity
+            )
+
+        for step in range(horizon):
+            timestep = state.timestep + step
+            if timestep > self._max_timestep:
+                break
+            # the episode ends after the step where it is done, as in `step`
+            done = battery_capacity <= self._min_battery_capacity
+            if timestep >= self._max_timestep:
+                done[:] = True
+            production = scenario.production[timestep]
+            charge_amount = np.ceil(
+                self._action_values[action_sequences[:, step]]
+                - scenario.demand_of_electricity[timestep]
+            )
+            target_state_of_charge = state_of_charge + charge_amount
+            valid = running & (
+                (charge_amount <= production)
+                & (target_state_of_charge >= 0)
+                & (target_state_of_charge <= battery_capacity)
+            )
+            state_of_charge = np.where(valid, target_state_of_charge, state_of_charge)
+            battery_capacity = np.where(
+                valid,
+                battery_capacity * self._battery_degradation_factor,
+                battery_capacity,
+            )
+            battery_capacity = np.where(
+                valid & is_safe_range_violation(),
+                battery_capacity * self._unsafe_battery_degradation_factor,
+                battery_capacity,
+            )
+            # `_reward` checks the safe range again, after the extra degradation
+            sell_reward = (production - charge_amount) * scenario.sell_price[timestep]
+            rewards[:, step] = np.where(
+                valid,
+                np.where(
+                    is_safe_range_violation(), -0.8, sell_reward / self._max_reward
+                ),
+                np.where(running, -1.0, 0.0),
+            )
+            running &= ~done
+        return rewards
+
+    def _valid_actions_mask(self) -> np.ndarray:
+        """`_is_action_valid` of every action at once."""
+        charge_amounts = self._charge_amounts()
+        target_state_of_charge = self._current_state_of_charge + charge_amounts
+        return (
+            (charge_amounts <= self._production)
+            & (target_state_of_charge >= 0)
+            & (target_state_of_charge <= self._battery_capacity)
+        )
+
     def action_masks(self) -> np.ndarray:
         """Generate a boolean mask of valid actions for `MaskablePPO`."""
-        mask = np.array(
-            [self._is_action_valid(action) for action in range(self.action_space.n)],
-            dtype=bool,
-        )
-        if not np.any(mask):  # If all actions are invalid, force one to be valid
+        mask = self._valid_actions_mask()
+        if not mask.any():  # If all actions are invalid, force one to be valid
             mask[len(mask) // 2] = True
         return mask
 
     def _get_obs(self) -> np.ndarray:
         """Returns the current observation (state)."""
         safe_range_indicator = 1 if not self._is_safe_range_violation else 0
+        safe_range_low, safe_range_high = self._battery_safe_range
         return np.array(
             [
                 # Battery SoC
@@ -366,9 +754,9 @@ class ElectricityMarketEnv(gym.Env):
                 # current battery capacity
                 self._battery_capacity / self._config.init_battery_capacity,
                 # battery safe range low boundary
-                self._battery_safe_range[0] / self._config.init_battery_capacity,
+                safe_range_low / self._config.init_battery_capacity,
                 # battery safe range high boundary
-                self._battery_safe_range[1] / self._config.init_battery_capacity,
+                safe_range_high / self._config.init_battery_capacity,
                 # Current electricity demand
                 self._demand_of_electricity / self._max_demand_of_electricity,
                 # Current market price
@@ -382,35 +770,67 @@ class ElectricityMarketEnv(gym.Env):
         )
 
     def render(self) -> RenderFrame | list[RenderFrame] | None:
+        if not self._config.record_trajectory:
+            raise ValueError("rendering requires `EnvConfig(record_trajectory=True)`")
+        if self.render_mode == "rgb_array":
+            return self._render_rgb_array()
         if not self._is_done and self._timestep < self._config.max_timestep:
             return []
 
-        observations = np.array(self._episode_obs)
-        timesteps = np.arange(len(observations))
-        feature_labels = ["Battery Level", "Battery Capacity"]
+        # plotting libraries are only loaded once an episode is rendered
+        from matplotlib import pyplot as plt
+        from PIL import Image
+
+        fig, axes = plt.subplots(1, 3, figsize=(15, 6))
+        self._plot_trajectory(axes)
+        plt.pause(0.001)
+
+        # Convert plot to an image
+        buf = BytesIO()
+        plt.savefig(buf, format="png")
+        plt.close()
+        buf.seek(0)
 
-        # Create a figure with two subplots: one for Battery Level & Electricity Demand, and one for Price
-        fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 6))
+        img = Image.open(buf)
+        return [img]
+
+    def _render_rgb_array(self) -> np.ndarray:
+        """Draws the episode so far on a reused headless figure."""
+        if self._render_figure is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self._render_figure = Figure(figsize=(15, 6))
+            FigureCanvasAgg(self._render_figure)
+            self._render_figure.subplots(1, 3)
+        for ax in self._render_figure.axes:
+            ax.clear()
+        self._plot_trajectory(self._render_figure.axes)
+        self._render_figure.canvas.draw()
+        return np.asarray(self._render_figure.canvas.buffer_rgba())[..., :3].copy()
+
+    def _plot_trajectory(self, axes) -> None:
+        observations = self.trajectory.observations
+        feature_labels = ["Battery Level", "Battery Capacity"]
+        ax1, ax2, ax3 = axes
 
         # Plot Battery Level, Battery Capacity, and Electricity Demand in the first subplot (ax1)
         ax1.plot(
-            timesteps, observations[:, 0], label=feature_labels[0]
+            *_decimate(observations[:, 0]), label=feature_labels[0]
         )  # Battery Level (SoC)
         ax1.plot(
-            timesteps, observations[:, 1], label=feature_labels[1]
+            *_decimate(observations[:, 1]), label=feature_labels[1]
         )  # Battery Capacity
 
-        # Use the safe range boundaries from observations (indices 2 and 3)
-        low = observations[:, 2]  # Safe range low (from observation)
-        high = observations[:, 3]  # Safe range high (from observation)
-
-        # Plot the safe range boundaries (red lines)
+        # Plot the safe range boundaries from observations (indices 2 and 3) (red lines)
         ax1.plot(
-            timesteps, low, color="red", linestyle="--", label="Battery Safe Range Low"
+            *_decimate(observations[:, 2]),
+            color="red",
+            linestyle="--",
+            label="Battery Safe Range Low",
         )
         ax1.plot(
-            timesteps,
-            high,
+            *_decimate(observations[:, 3]),
             color="red",
             linestyle="--",
             label="Battery Safe Range High",
@@ -424,7 +844,7 @@ class ElectricityMarketEnv(gym.Env):
 
         # Plot the Price in the second subplot (ax2)
         ax2.plot(
-            timesteps, observations[:, 5], label="Price", color="orange"
+            *_decimate(observations[:, 5]), label="Price", color="orange"
         )  # Price from observation
 
         # Optionally, customize the second plot scale (e.g., different y-limits)
@@ -437,7 +857,7 @@ class ElectricityMarketEnv(gym.Env):
         ax2.legend()
 
         ax3.plot(
-            timesteps, observations[:, 4], label="Electricity Demand", color="orange"
+            *_decimate(observations[:, 4]), label="Electricity Demand", color="orange"
         )  # Price
         ax3.set_ylim(bottom=0)  # Adjust this as needed for your price range
 
@@ -446,14 +866,3 @@ class ElectricityMarketEnv(gym.Env):
         ax3.set_ylabel("Demand")
         ax3.set_title("Electricity Demand Over Time")
         ax3.legend()
-
-        plt.pause(0.001)
-
-        # Convert plot to an image
-        buf = BytesIO()
-        plt.savefig(buf, format="png")
-        plt.close()
-        buf.seek(0)
-
-        img = Image.open(buf)
-        return [img]
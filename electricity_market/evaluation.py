@@ -3,34 +3,121 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/15_evaluation.ipynb.
 
 # %% auto 0
-__all__ = ['plot_all_metrics']
+__all__ = ['aggregate_interval_estimates', 'probability_of_improvement_interval', 'plot_all_metrics']
 
 # %% ../nbs/15_evaluation.ipynb 3
 import itertools
-import pickle
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-import matplotlib.pyplot as plt
 import numpy as np
-import rliable.metrics
-import rliable.plot_utils
-import seaborn as sns
-
-from .env import ElectricityMarketEnv
-from electricity_market.player import (
-    A2CAgent,
-    MaskablePPOAgent,
-    MaskableRandomAgent,
-    expert_knowledge_action_masks,
-    is_action_safe,
-)
+
 from .utils import EvaluationData
 
 # %% ../nbs/15_evaluation.ipynb 4
+# aggregate metrics of score matrices (runs x tasks), batched over the leading axes
+def _iqm(scores: np.ndarray) -> np.ndarray:
+    import scipy.stats
+
+    flat_scores = scores.reshape(*scores.shape[:-2], -1)
+    return scipy.stats.trim_mean(flat_scores, proportiontocut=0.25, axis=-1)
+
+
+def _median(scores: np.ndarray) -> np.ndarray:
+    # as `rliable.metrics.aggregate_median`, the median of the task means
+    return np.median(np.mean(scores, axis=-2), axis=-1)
+
+
+def _mean(scores: np.ndarray) -> np.ndarray:
+    return np.mean(scores, axis=(-2, -1))
+
+
+_AGGREGATE_METRICS = {"IQM": _iqm, "Median": _median, "Mean": _mean}
+
+
+def _bootstrap_counts(indices: np.ndarray, n_runs: int) -> np.ndarray:
+    """How many times each run is drawn by every replicate of a `(reps, n_runs)` index matrix."""
+    reps = len(indices)
+    offset_indices = indices + n_runs * np.arange(reps)[:, None]
+    return np.bincount(offset_indices.ravel(), minlength=reps * n_runs).reshape(
+        reps, n_runs
+    )
+
+
+def _percentile_interval(replicates: np.ndarray, confidence: float) -> np.ndarray:
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(replicates, [tail, 100 - tail])
+
+# %% ../nbs/15_evaluation.ipynb 5
+def aggregate_interval_estimates(
+    scores: np.ndarray,
+    reps: int = 50_000,
+    confidence: float = 0.95,
+    rng: np.random.Generator | None = None,
+) -> tuple[dict, dict]:
+    """
+    The IQM, median and mean of a (runs x tasks) score matrix, with their stratified
+    bootstrap percentile confidence intervals.
+    """
+    rng = np.random.default_rng(rng)
+    n_runs, n_tasks = scores.shape
+    # the runs of every replicate, resampled within each task
+    indices = rng.integers(n_runs, size=(reps, n_runs, n_tasks))
+    replicates = scores[indices, np.arange(n_tasks)]
+    point_estimates = {
+        name: metric(scores) for name, metric in _AGGREGATE_METRICS.items()
+    }
+    interval_estimates = {
+        name: _percentile_interval(metric(replicates), confidence)
+        for name, metric in _AGGREGATE_METRICS.items()
+    }
+    return point_estimates, interval_estimates
+
+
+def probability_of_improvement_interval(
+    scores_x: np.ndarray,
+    scores_y: np.ndarray,
+    reps: int = 50_000,
+    confidence: float = 0.95,
+    rng: np.random.Generator | None = None,
+) -> tuple[float, np.ndarray]:
+    """
+    P(X > Y) of two (runs x tasks) score matrices, averaged over the tasks, with its
+    stratified bootstrap percentile confidence interval (X and Y resampled independently).
+    """
+    rng = np.random.default_rng(rng)
+    (n_runs_x, n_tasks), n_runs_y = scores_x.shape, len(scores_y)
+    point_estimate = 0.0
+    replicates = np.zeros(reps)
+    for task in range(n_tasks):
+        x, y = scores_x[:, task, None], scores_y[None, :, task]
+        # the improvement of every pair of runs, ties count as half
+        improvement = (x > y) + 0.5 * (x == y)
+        counts_x = _bootstrap_counts(
+            rng.integers(n_runs_x, size=(reps, n_runs_x)), n_runs_x
+        )
+        counts_y = _bootstrap_counts(
+            rng.integers(n_runs_y, size=(reps, n_runs_y)), n_runs_y
+        )
+        point_estimate += improvement.mean() / n_tasks
+        replicates += ((counts_x @ improvement) * counts_y).sum(axis=1) / (
+            n_runs_x * n_runs_y * n_tasks
+        )
+    return point_estimate, _percentile_interval(replicates, confidence)
+
+# %% ../nbs/15_evaluation.ipynb 6
 def plot_all_metrics(
     agent_eval_data: dict[str, EvaluationData],
+    reps: int = 50_000,
+    confidence: float = 0.95,
+    seed: int | None = None,
 ):
+    # plotting libraries are only loaded when plotting
+    import matplotlib.pyplot as plt
+    import rliable.plot_utils
+    import seaborn as sns
+
     sns.set_theme(style="whitegrid")
+    rng = np.random.default_rng(seed)
 
     def plot_aggregate_metrics():
         metrics = {
@@ -38,14 +125,18 @@ def plot_all_metrics(
             "Median": [],
             "Mean": [],
         }
+        intervals = {metric_name: [] for metric_name in metrics}
         agent_names = list(agent_eval_data.keys())
 
         for agent, data in agent_eval_data.items():
             rewards_matrix = np.array(data.rewards).reshape(len(data.rewards), 1)
 
-            metrics["IQM"].append(rliable.metrics.aggregate_iqm(rewards_matrix))
-            metrics["Median"].append(rliable.metrics.aggregate_median(rewards_matrix))
-            metrics["Mean"].append(rliable.metrics.aggregate_mean(rewards_matrix))
+            point_estimates, interval_estimates = aggregate_interval_estimates(
+                rewards_matrix, reps=reps, confidence=confidence, rng=rng
+            )
+            for metric_name in metrics:
+                metrics[metric_name].append(point_estimates[metric_name])
+                intervals[metric_name].append(interval_estimates[metric_name])
 
         # Create subplots for each metric
         fig, axes = plt.subplots(1, 3, figsize=(15, 5))
@@ -60,6 +151,16 @@ def plot_all_metrics(
                 capsize=0.1,
                 legend=False,
             )
+            # confidence interval error bars
+            low, high = np.array(intervals[metric_name]).T
+            ax.errorbar(
+                x=np.arange(len(agent_names)),
+                y=values,
+                yerr=np.clip([values - low, high - values], 0, None),
+                fmt="none",
+                ecolor="black",
+                capsize=5,
+            )
             ax.set_title(f"{metric_name} Reward")
             ax.set_xlabel("Agent")
             ax.set_ylabel("Reward")
@@ -78,7 +179,10 @@ def plot_all_metrics(
         probability_interval_estimates = {}
 
         # Compare each pair of agents using itertools.combinations
-        for agent1, agent2 in itertools.combinations(agents, 2):
+        pairs = list(itertools.combinations(agents, 2))
+
+        def estimate(pair, pair_rng):
+            agent1, agent2 = pair
             # Get the rewards for each agent as lists
             rewards1 = agent_eval_data[agent1].rewards
             rewards2 = agent_eval_data[agent2].rewards
@@ -86,20 +190,26 @@ def plot_all_metrics(
             rewards1_reshaped = np.array(rewards1).reshape(len(rewards1), 1)
             rewards2_reshaped = np.array(rewards2).reshape(len(rewards2), 1)
 
-            # Calculate the probability of improvement between the two agents
-            prob_improvement = rliable.metrics.probability_of_improvement(
-                rewards1_reshaped, rewards2_reshaped
+            # Calculate the probability of improvement between the two agents, with its confidence interval
+            return probability_of_improvement_interval(
+                rewards1_reshaped,
+                rewards2_reshaped,
+                reps=reps,
+                confidence=confidence,
+                rng=pair_rng,
             )
 
-            # Calculate the confidence intervals (e.g., bootstrap method, here assuming it is available)
-            # If you have an existing method to calculate the intervals, apply it
-            # For simplicity, we use placeholders here
-            prob_interval = [0.0, 1.0]  # Replace with actual interval calculation
+        # the pairs are bootstrapped in parallel, each with its own generator
+        with ThreadPoolExecutor() as executor:
+            estimates = executor.map(estimate, pairs, rng.spawn(len(pairs)))
 
             # Store the probability and interval estimates
-            pair = f"{agent1},{agent2}"
-            probability_estimates[pair] = prob_improvement
-            probability_interval_estimates[pair] = prob_interval
+            for (agent1, agent2), (prob_improvement, prob_interval) in zip(
+                pairs, estimates
+            ):
+                pair = f"{agent1},{agent2}"
+                probability_estimates[pair] = prob_improvement
+                probability_interval_estimates[pair] = prob_interval
 
         # Plot the probability of improvement using the rliable function
         rliable.plot_utils.plot_probability_of_improvement(
@@ -0,0 +1,173 @@
+"""This module provides an environment of a fleet of batteries selling into one electricity market."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_fleet.ipynb.
+
+# %% auto 0
+__all__ = ['ElectricityMarketFleetEnv']
+
+# %% ../nbs/03_fleet.ipynb 3
+import gymnasium as gym
+import numpy as np
+
+from .battery_dynamics import BatteryDynamics
+from .env import ElectricityMarketEnv, EnvConfig, get_scenario
+
+# %% ../nbs/03_fleet.ipynb 4
+class ElectricityMarketFleetEnv(gym.Env):
+    """
+    One agent controlling `n_batteries` batteries of `ElectricityMarketEnv`, each at its own site.
+
+    The batteries sell at the sell price of one shared scenario, the sell price of
+    `ElectricityMarketEnv` reset with the same seed, while the weather, production and demand of
+    every site are drawn each timestep. The state of the fleet is held as arrays and stepped with
+    array operations, an observation is the `(n_batteries, 8)` observations of the batteries.
+
+    An action holds the action of every battery, or with `n_bins`, one of `n_bins` evenly spaced
+    points of the valid actions of every battery, as `CompactActionWrapper` does. The reward is
+    the mean reward of the batteries, the `rewards` info holds the reward of every battery.
+    A battery is retired after the step where it reaches the termination capacity, its actions
+    are ignored and its rewards are 0, and the episode ends once every battery is retired.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(
+        self,
+        n_batteries: int,
+        env_config: EnvConfig | None = None,
+        n_bins: int | None = None,
+    ):
+        if env_config is None:
+            env_config = EnvConfig()
+        self._config = env_config
+        self.n_batteries = n_batteries
+        self.n_bins = n_bins
+        # the scalar environment defines the actions and the normalization bounds
+        env = ElectricityMarketEnv(env_config)
+        self._dynamics = BatteryDynamics(env)
+        self._n_actions = env.action_space.n
+        self._calendar = env._calendar
+
+        if n_bins is not None and n_bins < 2:
+            raise ValueError(f"at least 2 bins are needed, got {n_bins}")
+        self.action_space = gym.spaces.MultiDiscrete(
+            np.full(n_batteries, self._n_actions if n_bins is None else n_bins)
+        )
+        self.observation_space = gym.spaces.Box(
+            low=np.broadcast_to(env.observation_space.low, (n_batteries, 8)),
+            high=np.broadcast_to(env.observation_space.high, (n_batteries, 8)),
+            dtype=np.float64,
+        )
+        self._timestep = 0
+        self._scenario = get_scenario(env_config, np_random=self.np_random)
+        self._state_of_charge = np.full(
+            n_batteries, env_config.init_state_of_charge, dtype=np.float64
+        )
+        self._battery_capacity = np.full(
+            n_batteries, env_config.init_battery_capacity, dtype=np.float64
+        )
+        self._is_active = np.ones(n_batteries, dtype=bool)
+        self._draw_sites()
+
+    def reset(self, *, seed: int | None = None, options: dict | None = None):
+        """Resets every battery to the initial state."""
+        super().reset(seed=seed, options=options)
+        self._timestep = 0
+        self._scenario = get_scenario(self._config, seed, self.np_random)
+        self._state_of_charge.fill(self._config.init_state_of_charge)
+        self._battery_capacity.fill(self._config.init_battery_capacity)
+        self._is_active.fill(True)
+        self._draw_sites()
+        return self._get_obs(), {}
+
+    def _draw_sites(self) -> None:
+        """Draws the weather, production and demand of every site at the current timestep."""
+        # same as the weather, production and demand of `_generate_scenario`, drawn for
+        # every site
+        weather = self._calendar.draw_weather(
+            self._timestep, self.np_random.random(self.n_batteries)
+        )
+        self._production = self._calendar.production(self._timestep, weather)
+        self._demand_of_electricity = self._calendar.draw_demand(
+            self._timestep, self.np_random.random(self.n_batteries)
+        )
+        self._sell_price = self._scenario.sell_price[self._timestep]
+
+    def _charge_amounts(self, actions: np.ndarray) -> np.ndarray:
+        return self._dynamics.charge_amounts(actions, self._demand_of_electricity)
+
+    def step(self, action: np.ndarray) -> tuple:
+        actions = np.asarray(action, dtype=np.int64)
+        if self.n_bins is not None:
+            actions = self._bin_actions(actions)
+        charge_amounts = self._charge_amounts(actions)
+        truncated = self._timestep >= self._config.max_timestep
+        # batteries at the termination capacity take their last step
+        is_retiring = self._dynamics.is_done(self._battery_capacity)
+        rewards = self._dynamics.step(
+            self._state_of_charge,
+            self._battery_capacity,
+            charge_amounts,
+            self._production,
+            self._sell_price,
+            self._is_active,
+        )
+        self._is_active &= ~is_retiring
+
+        self._timestep += 1
+        self._draw_sites()
+        done = truncated or not self._is_active.any()
+        return (
+            self._get_obs(),
+            float(rewards.mean()),
+            done,
+            truncated,
+            {"rewards": rewards},
+        )
+
+    def valid_action_intervals(self) -> tuple[np.ndarray, np.ndarray]:
+        """The lowest and highest valid actions of every battery, the rows of `action_masks` are contiguous."""
+        # the valid charge amounts, the state of charge is a whole number
+        low_charge = -self._state_of_charge
+        high_charge = np.floor(
+            np.minimum(self._production, self._battery_capacity - self._state_of_charge)
+        )
+        offset = -self._dynamics.action_values[0]
+        low = np.floor(low_charge - 1 + self._demand_of_electricity) + 1 + offset
+        high = np.floor(high_charge + self._demand_of_electricity) + offset
+        low = np.clip(low, 0, self._n_actions - 1).astype(np.int64)
+        high = np.clip(high, 0, self._n_actions - 1).astype(np.int64)
+        # the bounds are computed in floating point, set them by the charge amounts of `step`
+        low += self._charge_amounts(low) < low_charge
+        low -= (low > 0) & (self._charge_amounts(np.maximum(low - 1, 0)) >= low_charge)
+        high -= self._charge_amounts(high) > high_charge
+        high += (high < self._n_actions - 1) & (
+            self._charge_amounts(np.minimum(high + 1, self._n_actions - 1))
+            <= high_charge
+        )
+        # If all actions are invalid, force one to be valid
+        is_empty = low > high
+        low[is_empty] = high[is_empty] = self._n_actions // 2
+        return low, high
+
+    def _bin_actions(self, bins: np.ndarray) -> np.ndarray:
+        low, high = self.valid_action_intervals()
+        return low + np.rint(bins / (self.n_bins - 1) * (high - low)).astype(np.int64)
+
+    def action_masks(self) -> np.ndarray:
+        """Generate a `(n_batteries, n_actions)` boolean mask of valid actions for `MaskablePPO`."""
+        return self._dynamics.action_masks(
+            self._state_of_charge,
+            self._battery_capacity,
+            self._production,
+            self._demand_of_electricity,
+        )
+
+    def _get_obs(self) -> np.ndarray:
+        return self._dynamics.observations(
+            self._state_of_charge,
+            self._battery_capacity,
+            self._production,
+            self._demand_of_electricity,
+            self._sell_price,
+        )
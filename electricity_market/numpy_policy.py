@@ -0,0 +1,202 @@
+"""This module exports the actor of trained policies for inference with NumPy only."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_numpy_policy.ipynb.
+
+# %% auto 0
+__all__ = ['NumpyPolicy', 'export_numpy_policy', 'NumpyPolicyAgent']
+
+# %% ../nbs/06_numpy_policy.ipynb 3
+from pathlib import Path
+
+import gymnasium as gym
+import numpy as np
+
+from .env import ElectricityMarketEnv, EnvConfig
+from .utils import EvaluationData, EvaluationLoop
+
+# %% ../nbs/06_numpy_policy.ipynb 4
+def _relu(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    return np.maximum(x, 0, out=out)
+
+
+# activation layers of the policy network, by their torch class name
+_ACTIVATIONS = {"Tanh": np.tanh, "ReLU": _relu}
+
+# %% ../nbs/06_numpy_policy.ipynb 5
+class NumpyPolicy:
+    """
+    The actor of a policy exported by `export_numpy_policy`, evaluated in float32 like torch.
+
+    `maskable` tells if the policy was trained with action masks, and so should be given them.
+    """
+
+    def __init__(
+        self, weights: list, biases: list, activations: list, maskable: bool = False
+    ):
+        self._weights = [np.ascontiguousarray(weight) for weight in weights]
+        self._biases = biases
+        self._activation_names = activations
+        self._activations = [_ACTIVATIONS[activation] for activation in activations]
+        self.maskable = maskable
+
+    def save(self, path: str | Path) -> None:
+        np.savez(
+            path,
+            activations=np.array(self._activation_names),
+            maskable=np.array(self.maskable),
+            **{f"weight_{i}": weight for i, weight in enumerate(self._weights)},
+            **{f"bias_{i}": bias for i, bias in enumerate(self._biases)},
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "NumpyPolicy":
+        with np.load(path) as data:
+            activations = list(data["activations"])
+            n_layers = len(activations) + 1
+            return cls(
+                [data[f"weight_{i}"] for i in range(n_layers)],
+                [data[f"bias_{i}"] for i in range(n_layers)],
+                activations,
+                bool(data["maskable"]),
+            )
+
+    def action_logits(self, observations: np.ndarray) -> np.ndarray:
+        """The logits of the actions of a single observation or a batch of them."""
+        x = np.asarray(observations, dtype=np.float32)
+        # in place, a single observation is dominated by the overhead of the NumPy calls
+        for weight, bias, activation in zip(
+            self._weights, self._biases, self._activations
+        ):
+            x = x @ weight
+            x += bias
+            activation(x, out=x)
+        logits = x @ self._weights[-1]
+        logits += self._biases[-1]
+        return logits
+
+    def predict(
+        self, observations: np.ndarray, action_masks: np.ndarray | None = None
+    ) -> np.ndarray:
+        """The actions of `model.predict(observations, deterministic=True, action_masks=action_masks)`."""
+        logits = self.action_logits(observations)
+        if action_masks is None:
+            return logits.argmax(axis=-1)
+        if logits.ndim == 1:
+            # the best of the valid actions, cheaper than masking the invalid ones
+            valid_actions = action_masks.nonzero()[0]
+            return valid_actions[logits[valid_actions].argmax()]
+        np.putmask(logits, ~np.asarray(action_masks), -np.inf)
+        return logits.argmax(axis=-1)
+
+# %% ../nbs/06_numpy_policy.ipynb 6
+def export_numpy_policy(model, path: str | Path) -> NumpyPolicy:
+    """Saves the actor of a stable-baselines3 actor-critic `model` to a `.npz` file."""
+    policy = model.policy
+    # the actions are the argmax of the logits, only of categorical distributions
+    if not isinstance(model.action_space, gym.spaces.Discrete):
+        raise ValueError(
+            f"only policies of `Discrete` actions can be exported, not {model.action_space}"
+        )
+    if type(policy.pi_features_extractor).__name__ != "FlattenExtractor":
+        raise ValueError("only policies with a `FlattenExtractor` can be exported")
+
+    weights, biases, activations = [], [], []
+    for layer in [*policy.mlp_extractor.policy_net, policy.action_net]:
+        layer_type = type(layer).__name__
+        if layer_type == "Linear" and len(weights) == len(activations):
+            # transposed, so the observations are multiplied from the left
+            weights.append(layer.weight.detach().cpu().numpy().T.astype(np.float32))
+            biases.append(layer.bias.detach().cpu().numpy().astype(np.float32))
+        elif layer_type in _ACTIVATIONS and len(weights) == len(activations) + 1:
+            activations.append(layer_type)
+        else:
+            raise ValueError(f"unsupported policy layer {layer}")
+
+    # `MaskableActorCriticPolicy` of sb3-contrib, whose actions are chosen with masks
+    maskable = type(policy).__name__.startswith("Maskable")
+    numpy_policy = NumpyPolicy(weights, biases, activations, maskable)
+    numpy_policy.save(path)
+    return numpy_policy
+
+# %% ../nbs/06_numpy_policy.ipynb 7
+class NumpyPolicyAgent(EvaluationLoop):
+    """
+    Runs a policy exported by `export_numpy_policy` with NumPy, without torch or stable-baselines3.
+
+    The invalid actions are masked only if the exported model was trained with masks, so the
+    agent chooses the actions of the model it was exported from.
+    `evaluate` plays the episodes of `Agent.evaluate` with the same `EvaluationLoop`, serially or
+    batched, in this process.
+    """
+
+    def __init__(
+        self,
+        env_config: EnvConfig | None = None,
+        render_mode: str | None = None,
+        name: str = "NumpyPolicyAgent",
+        policy_path: Path | None = None,
+    ):
+        self.name = name
+        self.env_config = env_config
+        self.env = ElectricityMarketEnv(env_config, render_mode=render_mode)
+        self.policy = None if policy_path is None else NumpyPolicy.load(policy_path)
+
+    @classmethod
+    def from_model_agent(
+        cls, agent, policy_path: Path, render_mode: str | None = None
+    ) -> "NumpyPolicyAgent":
+        """
+        Export the policy of a trained `ModelAgent` and run it with NumPy.
+        """
+        export_numpy_policy(agent.model, policy_path)
+        return cls(
+            agent.env_config,
+            render_mode=render_mode,
+            name=f"Numpy{agent.name}",
+            policy_path=policy_path,
+        )
+
+    def choose_action(self, obs: np.ndarray) -> int:
+        if not self.policy.maskable:
+            return self.policy.predict(obs)
+        return self.policy.predict(obs, action_masks=self.env.action_masks())
+
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        if not self.policy.maskable:
+            return self.policy.predict(observations)
+        return self.policy.predict(
+            observations,
+            action_masks=np.stack([env.action_masks() for env in envs]),
+        )
+
+    def evaluate(
+        self,
+        seeds: list[int],
+        render: bool = False,
+        batched: bool = False,
+        trace_dir: Path | None = None,
+        oracle: bool = True,
+    ) -> EvaluationData:
+        """
+        Evaluate the policy on `seeds`, and return EvaluationData.
+
+        With `batched`, the seeds are stepped together and their actions are chosen with one
+        `choose_actions` call per timestep.
+        With `trace_dir`, the steps of every seed are streamed into a trace store, see
+        `load_traces`.
+        With `oracle`, the perfect foresight reward of every seed is reported as
+        `oracle_rewards`.
+        """
+        if batched:
+            all_rewards = self._evaluate_batched(seeds, render, trace_dir)
+        else:
+            all_rewards = [
+                self._evaluate_seed(seed, render, trace_dir) for seed in seeds
+            ]
+        return self._evaluation_data(seeds, all_rewards, oracle, trace_dir)
+
+    def save_model(self, model_path: Path) -> None:
+        self.policy.save(model_path)
+
+    def load_model(self, model_path: Path) -> None:
+        self.policy = NumpyPolicy.load(model_path)
@@ -3,16 +3,30 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/10_player.ipynb.
 
 # %% auto 0
-__all__ = ['N_TRAIN_EPISODES', 'N_TRAILS', 'TRAIN_SEEDS', 'EVALUATE_SEEDS', 'ENV_CONFIG', 'TENSORBOARD_PATH', 'LOGS_PATH',
-           'QUICK_MODE', 'evaluation_data_per_agent', 'Agent', 'ModelAgent', 'MaskableAgent', 'MaskableModelAgent',
-           'MaskableRandomAgent', 'A2CAgent', 'MaskablePPOAgent', 'is_action_safe', 'expert_knowledge_action_masks']
+__all__ = ['N_TRAIN_EPISODES', 'N_TRAILS', 'TRAIN_SEEDS', 'EVALUATE_SEEDS', 'N_PRUNING_SEEDS', 'ENV_CONFIG', 'TENSORBOARD_PATH',
+           'LOGS_PATH', 'TRACES_PATH', 'CHECKPOINT_FREQ', 'N_CHECKPOINTS_TO_KEEP', 'CHECKPOINT_EVALUATION_FREQ',
+           'N_CHECKPOINT_SEEDS', 'PROFILE_HOT_PATHS', 'PROFILE_FLUSH_FREQ', 'QUICK_MODE', 'evaluation_data_per_agent',
+           'TRAINING_HOT_PATHS', 'EVALUATION_HOT_PATHS', 'AsyncCheckpointCallback', 'ProfilingCallback',
+           'is_action_safe', 'expert_knowledge_action_masks', 'Agent', 'ModelAgent', 'MaskableAgent',
+           'MaskableModelAgent', 'MaskableRandomAgent', 'DPAgent', 'A2CAgent', 'MaskablePPOAgent', 'CompactPPOAgent']
 
 # %% ../nbs/10_player.ipynb 3
-import pickle
+import contextlib
+import copy
+import functools
+import io
+import itertools
+import math
+import multiprocessing
 import shutil
+import tempfile
 from abc import ABC
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+import gymnasium as gym
 import numpy as np
 import optuna
 import torch
@@ -20,13 +34,20 @@ import yaml
 from sb3_contrib import MaskablePPO
 from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
 from sb3_contrib.common.wrappers import ActionMasker
-from stable_baselines3 import A2C
-from stable_baselines3.common.callbacks import CheckpointCallback
+from stable_baselines3 import A2C, PPO
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.logger import TensorBoardOutputFormat
 from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.on_policy_algorithm import OnPolicyAlgorithm
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from torch.utils.tensorboard import SummaryWriter
 from tqdm.notebook import tqdm
 
+from .dynamic_programming import BatteryDP
 from .env import ElectricityMarketEnv, EnvConfig
-from .utils import EvaluationData
+from .profiling import ENV_HOT_PATHS, HotPathProfiler
+from .utils import EvaluationData, EvaluationLoop
+from .wrappers import CompactActionWrapper, DecisionIntervalWrapper
 
 # %% ../nbs/10_player.ipynb 4
 N_TRAIN_EPISODES = 3
@@ -95,10 +116,23 @@ EVALUATE_SEEDS = [
     967995,
     992634,
 ]
+# the first N_PRUNING_SEEDS evaluation seeds score the trials for pruning during `optimize`
+N_PRUNING_SEEDS = 5
 ENV_CONFIG = EnvConfig()
 
 TENSORBOARD_PATH = Path("../tensorboard")
 LOGS_PATH = Path("../logs")
+TRACES_PATH = Path("../traces")
+CHECKPOINT_FREQ = 1000
+N_CHECKPOINTS_TO_KEEP = 3
+# every CHECKPOINT_EVALUATION_FREQ timesteps, the policy is scored on the first N_CHECKPOINT_SEEDS
+# evaluation seeds, and the best one is kept
+CHECKPOINT_EVALUATION_FREQ = 50_000
+N_CHECKPOINT_SEEDS = 3
+# opt-in timing of the hot paths, written to the TensorBoard runs every PROFILE_FLUSH_FREQ timesteps
+# of training and after every evaluation
+PROFILE_HOT_PATHS = False
+PROFILE_FLUSH_FREQ = 1000
 
 # Set QUICK_MODE = True for CI
 QUICK_MODE = True
@@ -109,49 +143,362 @@ if QUICK_MODE:
     EVALUATE_SEEDS = [90000]
     TENSORBOARD_PATH = None
     LOGS_PATH = None
+    TRACES_PATH = None
 
 evaluation_data_per_agent = {}
 
 # %% ../nbs/10_player.ipynb 6
-class Agent(ABC):
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    Checkpoint the policy every `save_freq` calls, writing the files on a background thread.
+
+    Keeps the last `keep_last` checkpoints. With `evaluate`, returning the evaluation reward of
+    the current policy, the policy is also scored every `evaluation_freq` calls, and the
+    checkpoint with the best reward is kept as `best_checkpoint_path`.
+    """
+
+    def __init__(
+        self,
+        save_freq: int,
+        save_path: Path,
+        name_prefix: str = "rl_model",
+        keep_last: int = 3,
+        evaluate: Callable[[], float] | None = None,
+        evaluation_freq: int | None = None,
+        verbose: int = 0,
+    ):
+        super().__init__(verbose)
+        self.save_freq = save_freq
+        self.save_path = Path(save_path)
+        self.name_prefix = name_prefix
+        self.keep_last = keep_last
+        self.evaluate = evaluate
+        self.evaluation_freq = evaluation_freq or save_freq
+        self.best_mean_reward = -np.inf
+        self.checkpoint_paths = deque()
+        self._writer = None
+        self._pending_writes = []
+
+    @property
+    def best_checkpoint_path(self) -> Path:
+        return self.save_path / f"{self.name_prefix}_best.pt"
+
+    def _init_callback(self) -> None:
+        self.save_path.mkdir(parents=True, exist_ok=True)
+
+    def _on_step(self) -> bool:
+        save = self.n_calls % self.save_freq == 0
+        score = self.evaluate is not None and self.n_calls % self.evaluation_freq == 0
+        if save or score:
+            self._checkpoint(save, score)
+        return True
+
+    def _on_training_start(self) -> None:
+        # a writer per `learn` call, the callback is reused across the calls of `train`
+        self._writer = ThreadPoolExecutor(max_workers=1)
+
+    def _on_training_end(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._writer.shutdown(wait=True)
+
+    def wait(self) -> None:
+        """
+        Wait for the pending checkpoints to be written, raising their errors.
+        """
+        for write in self._pending_writes:
+            write.result()
+        self._pending_writes = []
+
+    def _checkpoint(self, save: bool = True, score: bool = False) -> None:
+        # copy the weights now, training keeps updating them while the file is written
+        checkpoint = {
+            "num_timesteps": self.num_timesteps,
+            "policy": {
+                key: value.detach().to("cpu", copy=True)
+                for key, value in self.model.policy.state_dict().items()
+            },
+        }
+        is_best = False
+        if score:
+            mean_reward = self.evaluate()
+            is_best = mean_reward > self.best_mean_reward
+            self.best_mean_reward = max(mean_reward, self.best_mean_reward)
+
+        for write in [write for write in self._pending_writes if write.done()]:
+            write.result()
+            self._pending_writes.remove(write)
+        self._pending_writes.append(
+            self._writer.submit(self._write, checkpoint, save, is_best)
+        )
+
+    def _write(self, checkpoint: dict, save: bool, is_best: bool) -> None:
+        if is_best:
+            self._save(checkpoint, self.best_checkpoint_path)
+        if not save:
+            return
+        path = (
+            self.save_path
+            / f"{self.name_prefix}_{checkpoint['num_timesteps']}_steps.pt"
+        )
+        self._save(checkpoint, path)
+        self.checkpoint_paths.append(path)
+        while len(self.checkpoint_paths) > self.keep_last:
+            self.checkpoint_paths.popleft().unlink(missing_ok=True)
+        if self.verbose >= 2:
+            print(f"Saving model checkpoint to {path}")
+
+    @staticmethod
+    def _save(checkpoint: dict, path: Path) -> None:
+        # write then rename, so readers never see a partial file
+        tmp_path = path.with_suffix(".tmp")
+        torch.save(checkpoint, tmp_path)
+        tmp_path.replace(path)
+
+# %% ../nbs/10_player.ipynb 7
+# the policy updates of the agents are the `train` of their algorithm
+TRAINING_HOT_PATHS = [
+    *ENV_HOT_PATHS,
+    (OnPolicyAlgorithm, "collect_rollouts"),
+    (OnPolicyAlgorithm, "train"),
+]
+
+
+def _write_durations(
+    writer: SummaryWriter, durations: dict[str, np.ndarray], step: int
+) -> None:
+    """Write the histogram of the `durations` in µs, and their mean, under `profile/<key>`."""
+    for key, durations_ns in durations.items():
+        durations_us = durations_ns / 1000
+        writer.add_histogram(f"profile/{key}", durations_us, step)
+        writer.add_scalar(f"profile/{key}_mean_us", durations_us.mean(), step)
+    writer.flush()
+
+
+class ProfilingCallback(BaseCallback):
+    """
+    Enable `profiler` while training, and write its durations to the TensorBoard run of the model.
+
+    Every `flush_freq` timesteps, at the end of a rollout, the histogram of the durations in µs
+    and their mean are written under `profile/<class>.<method>`.
+    The environments of subprocess workers aren't profiled, only the rollouts and updates are.
+    """
+
+    def __init__(
+        self, profiler: HotPathProfiler, flush_freq: int = 1000, verbose: int = 0
+    ):
+        super().__init__(verbose)
+        self.profiler = profiler
+        self.flush_freq = flush_freq
+        self._tensorboard = None
+        self._enabled_profiler = False
+        self._last_flush = 0
+
+    def _on_training_start(self) -> None:
+        self._tensorboard = next(
+            (
+                output_format.writer
+                for output_format in self.logger.output_formats
+                if isinstance(output_format, TensorBoardOutputFormat)
+            ),
+            None,
+        )
+        self._enabled_profiler = not self.profiler.enabled
+        self.profiler.enable()
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        if self.num_timesteps - self._last_flush >= self.flush_freq:
+            self.flush()
+
+    def _on_training_end(self) -> None:
+        if self._enabled_profiler:
+            self.profiler.disable()
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the durations recorded since the last flush."""
+        self._last_flush = self.num_timesteps
+        durations = self.profiler.pop_durations()
+        if self._tensorboard is None:
+            return
+        _write_durations(self._tensorboard, durations, self.num_timesteps)
+
+# %% ../nbs/10_player.ipynb 8
+def is_action_safe(self, action: int) -> bool:
+    charge_amount = self._charge_amount(action)
+    target_state_of_charge = self._current_state_of_charge + charge_amount
+    low, high = self._battery_safe_range
+    return high > target_state_of_charge > low
+
+
+def expert_knowledge_action_masks(self) -> np.ndarray:
+    target_state_of_charge = self._current_state_of_charge + self._charge_amounts()
+    low, high = self._battery_safe_range
+    mask = (
+        self._valid_actions_mask()
+        & (target_state_of_charge > low)
+        & (target_state_of_charge < high)
+    )
+    if not mask.any():
+        mask[len(mask) // 2] = True
+    return mask
+
+# %% ../nbs/10_player.ipynb 9
+def _expert_masks_enabled() -> bool:
+    """Whether the masks of `ElectricityMarketEnv` are patched with `expert_knowledge_action_masks`."""
+    return ElectricityMarketEnv.action_masks is expert_knowledge_action_masks
+
+
+def _init_worker(expert_masks: bool) -> None:
+    """
+    Prepare a worker process of the evaluations, trainings and optimizations.
+
+    The workers are started with the default start method of the platform, so they don't
+    necessarily inherit the patched environment methods of the parent process (expert masks).
+    Their setting is passed to every worker instead, and patched again here.
+    """
+    # the workers already run in parallel
+    torch.set_num_threads(1)
+    if expert_masks:
+        setattr(ElectricityMarketEnv, "action_masks", expert_knowledge_action_masks)
+        setattr(ElectricityMarketEnv, "is_action_safe", is_action_safe)
+
+
+# the agent of an evaluation worker process, set by `_init_evaluation_worker`
+_evaluation_worker_agent = None
+
+
+def _init_evaluation_worker(agent_class, init_kwargs, model_path, expert_masks) -> None:
+    global _evaluation_worker_agent
+    _init_worker(expert_masks)
+    _evaluation_worker_agent = agent_class(**init_kwargs)
+    if model_path is not None:
+        _evaluation_worker_agent.load_model(model_path)
+
+
+def _evaluate_seed_in_worker(seed: int, trace_dir: Path | None = None) -> float:
+    return _evaluation_worker_agent._evaluate_seed(seed, trace_dir=trace_dir)
+
+
+class _SeedScheduleWrapper(gym.Wrapper):
+    """Resets the env with the next seed of its schedule, cycling through it."""
+
+    def __init__(self, env: gym.Env, seeds: list[int]):
+        super().__init__(env)
+        self._seeds = itertools.cycle(seeds)
+
+    def reset(self, *, seed: int | None = None, options: dict | None = None):
+        return self.env.reset(seed=next(self._seeds), options=options)
+
+
+def _make_training_env(env: gym.Env, seeds: list[int], expert_masks: bool) -> gym.Env:
+    """The env of a training worker process, playing its schedule of seeds."""
+    _init_worker(expert_masks)
+    return _SeedScheduleWrapper(env, seeds)
+
+
+class Agent(EvaluationLoop, ABC):
     def __init__(self, name, env, device):
         self.name = name
         self.device = device
         self.env = env
+        self._n_profiled_evaluations = 0
 
-    def evaluate(self, render: bool = False) -> EvaluationData:
+    def evaluate(
+        self,
+        render: bool = False,
+        workers: int | None = None,
+        batched: bool = False,
+        trace_dir: Path | None = None,
+        seeds: list[int] | None = None,
+        oracle: bool = True,
+    ) -> EvaluationData:
         """
         Evaluate the model, and return EvaluationData.
-        """
-        all_rewards = []
 
-        for seed in tqdm(EVALUATE_SEEDS, desc="seeds"):
-            obs, _ = self.env.reset(seed=seed)
-            episode_rewards = []
-            done = False
-
-            while not done:
-                obs_tensor = torch.tensor(obs, dtype=torch.float64).to(self.device)
-
-                action = self.choose_action(obs_tensor)
-                obs, reward, done, truncated, _ = self.env.step(action)
-                episode_rewards.append(reward)
+        With `workers`, the seeds are split between that many worker processes, each
+        rebuilding the agent from its `_init_kwargs` and model weights.
+        With `batched`, the seeds are stepped together and their actions are chosen
+        with one `choose_actions` call per timestep.
+        With `trace_dir`, the steps of every seed are streamed into a trace store, see
+        `load_traces`.
+        The seeds are `EVALUATE_SEEDS` unless `seeds` are given.
+        With `oracle`, the perfect foresight reward of every seed is reported as
+        `oracle_rewards`.
+        With `PROFILE_HOT_PATHS`, the `EVALUATION_HOT_PATHS` of this process are timed and
+        written to the `<name>_evaluation` TensorBoard run, the workers aren't profiled.
+        """
+        if seeds is None:
+            seeds = EVALUATE_SEEDS
+        profiler = HotPathProfiler(EVALUATION_HOT_PATHS) if PROFILE_HOT_PATHS else None
+        with profiler or contextlib.nullcontext():
+            if batched:
+                if workers is not None and workers > 1:
+                    raise ValueError("batched evaluation doesn't support workers")
+                with tqdm(total=len(seeds), desc="seeds") as progress:
+                    all_rewards = self._evaluate_batched(
+                        seeds, render, trace_dir, progress
+                    )
+            elif workers is None or workers <= 1:
+                all_rewards = [
+                    self._evaluate_seed(seed, render, trace_dir)
+                    for seed in tqdm(seeds, desc="seeds")
+                ]
+            elif render:
+                raise ValueError("rendering is not supported with workers")
+            else:
+                all_rewards = self._evaluate_in_workers(seeds, workers, trace_dir)
+        if profiler is not None:
+            self._write_profile(profiler.pop_durations())
 
-                if render:
-                    self.env.render()
+        return self._evaluation_data(seeds, all_rewards, oracle, trace_dir)
 
-                if truncated:
-                    break
+    def _write_profile(self, durations: dict[str, np.ndarray]) -> None:
+        self._n_profiled_evaluations += 1
+        if TENSORBOARD_PATH is None:
+            return
+        with SummaryWriter(TENSORBOARD_PATH / f"{self.name}_evaluation") as writer:
+            _write_durations(writer, durations, self._n_profiled_evaluations)
 
-            all_rewards.append(np.sum(episode_rewards))
+    def _evaluate_in_workers(
+        self, seeds: list[int], workers: int, trace_dir: Path | None = None
+    ) -> list:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = self._save_model_for_workers(Path(tmp_dir))
+            with ProcessPoolExecutor(
+                workers,
+                initializer=_init_evaluation_worker,
+                initargs=(
+                    type(self),
+                    self._init_kwargs,
+                    model_path,
+                    _expert_masks_enabled(),
+                ),
+            ) as executor:
+                # `map` keeps the order of the seeds
+                return list(
+                    tqdm(
+                        executor.map(
+                            _evaluate_seed_in_worker,
+                            seeds,
+                            itertools.repeat(trace_dir),
+                        ),
+                        total=len(seeds),
+                        desc="seeds",
+                    )
+                )
 
-        return EvaluationData(
-            episodes=list(range(len(all_rewards))),
-            rewards=all_rewards,
-        )
+    @property
+    def _init_kwargs(self) -> dict:
+        """The constructor arguments rebuilding this agent in a worker process."""
+        return {"env_config": self.env_config, "name": self.name}
 
-    def choose_action(self, obs_tensor):
-        raise NotImplementedError
+    def _save_model_for_workers(self, directory: Path) -> Path | None:
+        return None
 
 
 class ModelAgent(Agent):
@@ -160,32 +507,148 @@ class ModelAgent(Agent):
         self.model = model
         self.env_config = env_config
 
-    def train(self) -> None:
+    @property
+    def _episode_timesteps(self) -> int:
+        # an episode steps the timesteps 0 to `max_timestep`
+        return self.env.unwrapped._config.max_timestep + 1
+
+    def train(
+        self, workers: int | None = None, on_seed_trained: Callable | None = None
+    ) -> None:
         """
         Train the model
+
+        With `workers`, the training episodes of the seeds are split evenly between that
+        many subprocess envs, trained together in a single `learn` call. `workers` has to
+        divide the `len(TRAIN_SEEDS) * N_TRAIN_EPISODES` episodes, so every seed is trained
+        as often as in serial training.
+        `on_seed_trained` is called with the number of seeds trained so far after each
+        seed, or once after all of them with `workers`.
         """
-        checkpoint_callback = CheckpointCallback(save_freq=1000, save_path="../logs/")
+        callbacks = [
+            callback
+            for callback in (self._checkpoint_callback(), self._profiling_callback())
+            if callback is not None
+        ]
+        if workers is not None and workers > 1:
+            self._train_in_workers(workers, callbacks)
+            if on_seed_trained is not None:
+                on_seed_trained(len(TRAIN_SEEDS))
+            return
 
-        for seed in tqdm(TRAIN_SEEDS, desc="seeds"):
+        for n_trained_seeds, seed in enumerate(tqdm(TRAIN_SEEDS, desc="seeds"), 1):
             for _ in tqdm(range(N_TRAIN_EPISODES), desc="Training episodes"):
                 self.env.reset(seed=seed)
+                self.model.set_random_seed(seed)
                 self.model.learn(
-                    total_timesteps=self.env_config.max_timestep,
-                    callback=checkpoint_callback,
+                    total_timesteps=self._episode_timesteps,
+                    callback=callbacks,
                     reset_num_timesteps=False,
                     tb_log_name=self.name,
                 )
+            if on_seed_trained is not None:
+                on_seed_trained(n_trained_seeds)
+
+    def _train_in_workers(self, workers: int, callbacks: list) -> None:
+        # every seed is played for `N_TRAIN_EPISODES` episodes, split evenly between workers
+        schedule = [seed for seed in TRAIN_SEEDS for _ in range(N_TRAIN_EPISODES)]
+        if len(schedule) % workers != 0:
+            raise ValueError(
+                f"{workers} workers can't split the {len(schedule)} training episodes evenly"
+            )
+        episodes_per_worker = len(schedule) // workers
+        schedules = [
+            schedule[i : i + episodes_per_worker]
+            for i in range(0, len(schedule), episodes_per_worker)
+        ]
+        vec_env = SubprocVecEnv(
+            [
+                functools.partial(
+                    _make_training_env,
+                    copy.deepcopy(self.env),
+                    schedule,
+                    _expert_masks_enabled(),
+                )
+                for schedule in schedules
+            ]
+        )
+        try:
+            self.model = self._reload_model(vec_env)
+            self.model.set_random_seed(TRAIN_SEEDS[0])
+            self.model.learn(
+                total_timesteps=len(TRAIN_SEEDS)
+                * N_TRAIN_EPISODES
+                * self._episode_timesteps,
+                callback=callbacks,
+                reset_num_timesteps=False,
+                tb_log_name=self.name,
+            )
+        finally:
+            self.model = self._reload_model(self.env)
+            vec_env.close()
+
+    def _checkpoint_callback(self) -> AsyncCheckpointCallback | None:
+        if LOGS_PATH is None:
+            return None
+        return AsyncCheckpointCallback(
+            CHECKPOINT_FREQ,
+            LOGS_PATH,
+            name_prefix=self.name,
+            keep_last=N_CHECKPOINTS_TO_KEEP,
+            evaluate=self._checkpoint_reward,
+            evaluation_freq=CHECKPOINT_EVALUATION_FREQ,
+        )
 
-    def choose_action(self, obs_tensor):
-        action, _ = self.model.predict(obs_tensor, deterministic=True)
+    def _checkpoint_reward(self) -> float:
+        """
+        The mean reward of the current policy on the first `N_CHECKPOINT_SEEDS` evaluation seeds,
+        held out from training like the seeds scoring the trials of `optimize`.
+        """
+        evaluation_data = self.evaluate(
+            batched=True, seeds=EVALUATE_SEEDS[:N_CHECKPOINT_SEEDS], oracle=False
+        )
+        return np.mean(evaluation_data.rewards)
+
+    def _profiling_callback(self) -> ProfilingCallback | None:
+        if not PROFILE_HOT_PATHS:
+            return None
+        return ProfilingCallback(
+            HotPathProfiler(TRAINING_HOT_PATHS), flush_freq=PROFILE_FLUSH_FREQ
+        )
+
+    def load_checkpoint(self, checkpoint_path: Path) -> None:
+        """
+        Load the policy weights of a checkpoint written by `AsyncCheckpointCallback`.
+        """
+        checkpoint = torch.load(checkpoint_path, map_location=self.device)
+        self.model.policy.load_state_dict(checkpoint["policy"])
+
+    def _reload_model(self, env):
+        """Reload the model on `env`, resizing its rollout buffer for the number of envs."""
+        buffer = io.BytesIO()
+        self.model.save(buffer)
+        buffer.seek(0)
+        return self.model.load(buffer, env=env, device=self.device)
+
+    def choose_action(self, obs):
+        action, _ = self.model.predict(obs, deterministic=True)
         return action
 
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        actions, _ = self.model.predict(observations, deterministic=True)
+        return actions
+
     def save_model(self, model_path: Path) -> None:
         self.model.save(str(model_path))
 
     def load_model(self, model_path: Path) -> None:
         self.model = self.model.load(str(model_path), env=self.env)
 
+    def _save_model_for_workers(self, directory: Path) -> Path:
+        model_path = directory / "model"
+        self.save_model(model_path)
+        return model_path
+
 
 class MaskableAgent(Agent):
     @staticmethod
@@ -197,14 +660,30 @@ class MaskableAgent(Agent):
 
 
 class MaskableModelAgent(MaskableAgent, ModelAgent):
-    def choose_action(self, obs_tensor):
+    def choose_action(self, obs):
         action, _ = self.model.predict(
-            obs_tensor,
+            obs,
             action_masks=MaskableAgent.mask_fn(self.env),
             deterministic=True,
         )
 
-# %% ../nbs/10_player.ipynb 7
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        actions, _ = self.model.predict(
+            observations,
+            action_masks=np.stack([MaskableAgent.mask_fn(env) for env in envs]),
+            deterministic=True,
+        )
+        return actions
+
+# %% ../nbs/10_player.ipynb 10
+# the actions of the agents are only chosen in their evaluations
+EVALUATION_HOT_PATHS = [
+    *ENV_HOT_PATHS,
+    (Agent, "choose_action"),
+    (Agent, "choose_actions"),
+]
+
+# %% ../nbs/10_player.ipynb 11
 class MaskableRandomAgent(MaskableAgent):
     def __init__(
         self,
@@ -220,15 +699,98 @@ class MaskableRandomAgent(MaskableAgent):
             ElectricityMarketEnv(env_config, render_mode=render_mode), self.mask_fn
         )
         super().__init__(name, device=device, env=env)
+        self.env_config = env_config
 
-    def choose_action(self, obs_tensor):
+    def choose_action(self, obs):
         action_mask = self.env.action_masks()
         valid_actions = np.where(action_mask)[0]
-        action = np.random.choice(valid_actions)
+        action = self.env.unwrapped.np_random.choice(valid_actions)
 
         return action
 
-# %% ../nbs/10_player.ipynb 8
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        return np.array(
+            [
+                env.unwrapped.np_random.choice(np.where(env.action_masks())[0])
+                for env in envs
+            ]
+        )
+
+# %% ../nbs/10_player.ipynb 12
+class DPAgent(MaskableAgent):
+    """
+    Acts greedily on the values of `BatteryDP`, the optimal baseline to judge the other agents against.
+
+    The MDP is solved by `train`, or on the first action.
+    Batched evaluation recomputes the values of each timestep once for all the seeds.
+    Serial and worker evaluations play the seeds one after the other, and recomputing the
+    values of every timestep for each seed costs about a solve per seed. The last
+    `n_cached_blocks` blocks of values are kept, one by default. With `None`, every block is
+    kept so that only the first seed of a process recomputes them, which takes as much memory
+    as the values of every timestep (about 0.6 GB per process for the default `EnvConfig`).
+    """
+
+    def __init__(
+        self,
+        env_config: EnvConfig | None = None,
+        render_mode: str | None = None,
+        name: str = "DPAgent",
+        n_cached_blocks: int | None = 1,
+    ):
+        env = ActionMasker(
+            ElectricityMarketEnv(env_config, render_mode=render_mode), self.mask_fn
+        )
+        super().__init__(name, device="cpu", env=env)
+        self.env_config = env_config
+        self.n_cached_blocks = n_cached_blocks
+        self.dp = BatteryDP(env_config, n_cached_blocks=n_cached_blocks)
+
+    @property
+    def _init_kwargs(self) -> dict:
+        return {**super()._init_kwargs, "n_cached_blocks": self.n_cached_blocks}
+
+    def train(self) -> None:
+        """
+        Solve the MDP by backward induction.
+        """
+        self.dp.solve()
+
+    def choose_action(self, obs):
+        return self._greedy_action(self.env)
+
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        return np.array([self._greedy_action(env) for env in envs])
+
+    def _greedy_action(self, env) -> int:
+        if not self.dp.is_solved:
+            self.train()
+        unwrapped_env = env.unwrapped
+        action_values = self.dp.action_values(
+            unwrapped_env._timestep,
+            unwrapped_env._current_state_of_charge,
+            unwrapped_env._battery_capacity,
+            unwrapped_env._production,
+            unwrapped_env._sell_price,
+            unwrapped_env._charge_amounts(),
+        )
+        action_values[~MaskableAgent.mask_fn(env)] = -np.inf
+        return int(np.argmax(action_values))
+
+    def save_model(self, model_path: Path) -> None:
+        self.dp.save(model_path)
+
+    def load_model(self, model_path: Path) -> None:
+        self.dp.load(model_path)
+
+    def _save_model_for_workers(self, directory: Path) -> Path:
+        # solve once here rather than in every worker
+        if not self.dp.is_solved:
+            self.train()
+        model_path = directory / "values.npz"
+        self.save_model(model_path)
+        return model_path
+
+# %% ../nbs/10_player.ipynb 13
 class A2CAgent(ModelAgent):
     """A2C Agent for the Electricity Market Environment."""
 
@@ -253,7 +815,23 @@ class A2CAgent(ModelAgent):
             name=name, env=env, model=model, device=device, env_config=env_config
         )
 
-# %% ../nbs/10_player.ipynb 9
+# %% ../nbs/10_player.ipynb 14
+def _journal_storage(journal_path: str) -> optuna.storages.JournalStorage:
+    return optuna.storages.JournalStorage(
+        optuna.storages.journal.JournalFileBackend(journal_path)
+    )
+
+
+def _optimize_in_worker(
+    agent_class, env_config, name, journal_path, n_trials, expert_masks
+) -> None:
+    """Run `n_trials` trials of the study of the agent in a worker process."""
+    _init_worker(expert_masks)
+    agent = agent_class(env_config, name=name)
+    study = agent._create_study(_journal_storage(journal_path))
+    study.optimize(agent._objective, n_trials=n_trials, catch=(ValueError,))
+
+
 class MaskablePPOAgent(ModelAgent, MaskableAgent):
     """Maskable PPO Agent for the Electricity Market Environment."""
 
@@ -283,79 +861,130 @@ class MaskablePPOAgent(ModelAgent, MaskableAgent):
         self.optimized_hyperparameters = {}
         self.env_config = env_config or EnvConfig()
 
-    def choose_action(self, obs_tensor):
+    def choose_action(self, obs):
         action, _ = self.model.predict(
-            obs_tensor, deterministic=True, action_masks=MaskableAgent.mask_fn(self.env)
+            obs, deterministic=True, action_masks=MaskableAgent.mask_fn(self.env)
         )
         return action
 
-    def optimize(self) -> None:
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        actions, _ = self.model.predict(
+            observations,
+            deterministic=True,
+            action_masks=np.stack([MaskableAgent.mask_fn(env) for env in envs]),
+        )
+        return actions
+
+    def optimize(
+        self, workers: int | None = None, journal_path: str = "optuna_journal.log"
+    ) -> None:
         """
         Optimize the agent with hyperparameters.
-        """
-
-        def objective(trial):
-            learning_rate = trial.suggest_float("learning_rate", 1e-5, 1e-3, log=True)
-            n_steps = trial.suggest_int("n_steps", 32, 1024, log=True)
-            batch_size = trial.suggest_int("batch_size", 16, 256, log=True)
-            gae_lambda = trial.suggest_float("gae_lambda", 0.8, 1.0)
-            ent_coef = trial.suggest_float("ent_coef", 0.0, 0.02)
-            vf_coef = trial.suggest_float("vf_coef", 0.1, 1.0)
-            clip_range = trial.suggest_float("clip_range", 0.1, 0.3)
-            max_grad_norm = trial.suggest_float("max_grad_norm", 0.1, 1.0)
-
-            agent = MaskablePPOAgent(
-                self.env_config,
-            )
 
-            model = MaskablePPO(
-                MaskableActorCriticPolicy,
-                agent.env,
-                learning_rate=learning_rate,
-                n_steps=n_steps,
-                batch_size=batch_size,
-                gae_lambda=gae_lambda,
-                ent_coef=ent_coef,
-                vf_coef=vf_coef,
-                clip_range=clip_range,
-                max_grad_norm=max_grad_norm,
-                verbose=0,
-                device=self.device,
+        Each trial reports its mean reward on the first `N_PRUNING_SEEDS` evaluation
+        seeds after every training seed, so the pruner can stop bad trials early.
+        Without `workers`, the trials run one after the other in this process, with a sqlite
+        storage. Threads would contend for the GIL and patch the profiled hot paths together.
+        With `workers`, the trials run in that many processes sharing a journal file storage.
+        """
+        if workers is None or workers <= 1:
+            study = self._create_study("sqlite:///optuna_study.db")
+            study.optimize(
+                self._objective,
+                n_trials=N_TRAILS,
+                n_jobs=1,
+                show_progress_bar=True,
+                catch=(ValueError,),
             )
+        else:
+            study = self._create_study(_journal_storage(journal_path))
+            processes = [
+                multiprocessing.Process(
+                    target=_optimize_in_worker,
+                    args=(
+                        type(self),
+                        self.env_config,
+                        self.name,
+                        journal_path,
+                        len(trials),
+                        _expert_masks_enabled(),
+                    ),
+                )
+                for trials in np.array_split(range(N_TRAILS), workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            if any(process.exitcode != 0 for process in processes):
+                raise RuntimeError("an optimization worker failed")
 
-            agent.model = model
-            agent.train()
+        self.optimized_hyperparameters = study.best_params
 
-            return np.mean(agent.evaluate().rewards)
+        self.model = MaskablePPO(
+            MaskableActorCriticPolicy,
+            self.env,
+            **self.optimized_hyperparameters,
+            verbose=0,
+            tensorboard_log=f"./tensorboard/",
+            device=self.device,
+        )
 
-        study = optuna.create_study(
+    def _create_study(self, storage) -> optuna.Study:
+        return optuna.create_study(
             study_name=self.name,
-            storage="sqlite:///optuna_study.db",
+            storage=storage,
             load_if_exists=True,
             direction="maximize",
             pruner=optuna.pruners.HyperbandPruner(),
             sampler=optuna.samplers.TPESampler(),
         )
 
-        study.optimize(
-            objective,
-            n_trials=N_TRAILS,
-            n_jobs=-1,
-            show_progress_bar=True,
-            catch=(ValueError,),
-        )
+    def _objective(self, trial: optuna.Trial) -> float:
+        learning_rate = trial.suggest_float("learning_rate", 1e-5, 1e-3, log=True)
+        n_steps = trial.suggest_int("n_steps", 32, 1024, log=True)
+        batch_size = trial.suggest_int("batch_size", 16, 256, log=True)
+        gae_lambda = trial.suggest_float("gae_lambda", 0.8, 1.0)
+        ent_coef = trial.suggest_float("ent_coef", 0.0, 0.02)
+        vf_coef = trial.suggest_float("vf_coef", 0.1, 1.0)
+        clip_range = trial.suggest_float("clip_range", 0.1, 0.3)
+        max_grad_norm = trial.suggest_float("max_grad_norm", 0.1, 1.0)
 
-        self.optimized_hyperparameters = study.best_params
+        agent = MaskablePPOAgent(
+            self.env_config,
+        )
 
-        self.model = MaskablePPO(
+        model = MaskablePPO(
             MaskableActorCriticPolicy,
-            self.env,
-            **self.optimized_hyperparameters,
+            agent.env,
+            learning_rate=learning_rate,
+            n_steps=n_steps,
+            batch_size=batch_size,
+            gae_lambda=gae_lambda,
+            ent_coef=ent_coef,
+            vf_coef=vf_coef,
+            clip_range=clip_range,
+            max_grad_norm=max_grad_norm,
             verbose=0,
-            tensorboard_log=f"./tensorboard/",
             device=self.device,
         )
 
+        agent.model = model
+        mean_rewards = []
+
+        def report(n_trained_seeds: int) -> None:
+            evaluation_data = agent.evaluate(
+                batched=True, seeds=EVALUATE_SEEDS[:N_PRUNING_SEEDS], oracle=False
+            )
+            mean_rewards.append(np.mean(evaluation_data.rewards))
+            trial.report(mean_rewards[-1], n_trained_seeds)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+        agent.train(on_seed_trained=report)
+
+        return mean_rewards[-1]
+
     def export_hyperparameters(self, filename: str):
         """
         Export optimized learned_hyperparameters to a YAML file.
@@ -363,22 +992,55 @@ class MaskablePPOAgent(ModelAgent, MaskableAgent):
         with open(filename, "w") as file:
             yaml.dump(self.optimized_hyperparameters, file)
 
-# %% ../nbs/10_player.ipynb 19
-def is_action_safe(self, action: int) -> bool:
-    charge_amount = self._charge_amount(action)
-    target_state_of_charge = self._current_state_of_charge + charge_amount
-    low, high = self._battery_safe_range
-    return high > target_state_of_charge > low
+# %% ../nbs/10_player.ipynb 15
+class CompactPPOAgent(ModelAgent):
+    """
+    PPO Agent choosing among `n_bins` points of the valid actions, see `CompactActionWrapper`.
 
+    With `n_bins=None`, it chooses a continuous fraction of the valid actions instead.
+    With `decision_interval`, each choice is applied over that many timesteps, see
+    `DecisionIntervalWrapper`, and the discount factor is raised to the same power so the
+    horizon stays the same in timesteps.
+    """
 
-def expert_knowledge_action_masks(self) -> np.ndarray:
-    mask = np.array(
-        [
-            self._is_action_valid(action) and self.is_action_safe(action)
-            for action in range(self.action_space.n)
-        ],
-        dtype=bool,
-    )
-    if not np.any(mask):
-        mask[len(mask) // 2] = True
-    return mask
+    def __init__(
+        self,
+        env_config: EnvConfig | None = None,
+        render_mode: str | None = None,
+        name: str = "CompactPPOAgent",
+        n_bins: int | None = 21,
+        decision_interval: int = 1,
+    ):
+        env = CompactActionWrapper(
+            ElectricityMarketEnv(env_config, render_mode=render_mode), n_bins
+        )
+        if decision_interval > 1:
+            env = DecisionIntervalWrapper(env, decision_interval)
+        env = Monitor(env)
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = PPO(
+            "MlpPolicy",
+            env,
+            gamma=0.99**decision_interval,
+            verbose=0,
+            tensorboard_log=f"./tensorboard/",
+            device=device,
+        )
+        super().__init__(
+            name=name, env=env, model=model, device=device, env_config=env_config
+        )
+        self.n_bins = n_bins
+        self.decision_interval = decision_interval
+
+    @property
+    def _init_kwargs(self) -> dict:
+        return {
+            **super()._init_kwargs,
+            "n_bins": self.n_bins,
+            "decision_interval": self.decision_interval,
+        }
+
+    @property
+    def _episode_timesteps(self) -> int:
+        # a decision steps `decision_interval` timesteps, the last one of an episode fewer
+        return math.ceil(super()._episode_timesteps / self.decision_interval)
@@ -0,0 +1,140 @@
+"""This module times the hot paths of the environment and the agents."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_profiling.ipynb.
+
+# %% auto 0
+__all__ = ['ENV_HOT_PATHS', 'HotPathProfiler']
+
+# %% ../nbs/07_profiling.ipynb 3
+import functools
+import threading
+import time
+
+import numpy as np
+
+from .env import ElectricityMarketEnv
+
+# %% ../nbs/07_profiling.ipynb 4
+ENV_HOT_PATHS = [
+    (ElectricityMarketEnv, "step"),
+    (ElectricityMarketEnv, "reset"),
+    (ElectricityMarketEnv, "action_masks"),
+    (ElectricityMarketEnv, "_get_obs"),
+    (ElectricityMarketEnv, "render"),
+]
+
+# %% ../nbs/07_profiling.ipynb 5
+def _defining_classes(cls: type, name: str) -> list[type]:
+    """`cls` and its subclasses that define the method `name` themselves."""
+    classes, pending = [], [cls]
+    while pending:
+        candidate = pending.pop()
+        if candidate in classes:
+            continue
+        classes.append(candidate)
+        pending.extend(candidate.__subclasses__())
+    return [candidate for candidate in classes if name in vars(candidate)]
+
+
+class _Patch:
+    """
+    The timed wrapper of a method, shared by all the profilers enabled on it.
+
+    The wrapper records every call in the profilers of `self.profilers`,
+    a tuple replaced under `_PATCH_LOCK` so the calls can iterate over it without the lock.
+    """
+
+    def __init__(self, owner: type, name: str):
+        self.owner = owner
+        self.name = name
+        self.original = vars(owner)[name]
+        self.profilers = ()
+        self.timed = self._timed(self.original, f"{owner.__name__}.{name}")
+
+    def _timed(self, method, key: str):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                duration_ns = time.perf_counter_ns() - start
+                for profiler in self.profilers:
+                    profiler.record(key, duration_ns)
+
+        return timed
+
+
+# the methods patched by the enabled profilers, per `(class, method name)`
+_PATCHES: dict[tuple[type, str], _Patch] = {}
+_PATCH_LOCK = threading.Lock()
+
+# %% ../nbs/07_profiling.ipynb 6
+class HotPathProfiler:
+    """
+    Times the calls of the `(class, method name)` targets with `perf_counter_ns` while enabled.
+
+    Enabling wraps the methods, and their overrides in subclasses, on the classes themselves.
+    The wrappers are shared by the enabled profilers, each recording only while it is enabled,
+    and the last profiler disabled on a method restores it, so disabled profilers cost nothing.
+    The durations are kept per `<class>.<method>` until `pop_durations`.
+    """
+
+    def __init__(self, targets: list[tuple[type, str]] = ENV_HOT_PATHS):
+        self.targets = list(targets)
+        self._durations = {}
+        self._patches = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patches)
+
+    def enable(self) -> None:
+        with _PATCH_LOCK:
+            if self.enabled:
+                return
+            for cls, name in self.targets:
+                for owner in _defining_classes(cls, name):
+                    patch = _PATCHES.get((owner, name))
+                    if patch is None:
+                        patch = _PATCHES[(owner, name)] = _Patch(owner, name)
+                        setattr(owner, name, patch.timed)
+                    elif self in patch.profilers:
+                        continue
+                    patch.profilers = (*patch.profilers, self)
+                    self._patches.append(patch)
+
+    def disable(self) -> None:
+        with _PATCH_LOCK:
+            for patch in reversed(self._patches):
+                patch.profilers = tuple(
+                    profiler for profiler in patch.profilers if profiler is not self
+                )
+                if patch.profilers:
+                    continue
+                del _PATCHES[(patch.owner, patch.name)]
+                # keep a method replaced on the class since enabling
+                if vars(patch.owner).get(patch.name) is patch.timed:
+                    setattr(patch.owner, patch.name, patch.original)
+            self._patches = []
+
+    def __enter__(self) -> "HotPathProfiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def record(self, key: str, duration_ns: int) -> None:
+        self._durations.setdefault(key, []).append(duration_ns)
+
+    def pop_durations(self) -> dict[str, np.ndarray]:
+        """The durations in ns recorded since the last call, per key."""
+        durations = {
+            key: np.array(values, dtype=np.int64)
+            for key, values in self._durations.items()
+            if values
+        }
+        for values in self._durations.values():
+            values.clear()
+        return durations
@@ -3,13 +3,303 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_utils.ipynb.
 
 # %% auto 0
-__all__ = ['EvaluationData']
+__all__ = ['TRACE_COLUMNS', 'TRACE_CHUNK_SIZE', 'EvaluationData', 'EpisodeTraceWriter', 'write_oracle_rewards', 'load_traces',
+           'load_evaluation_data', 'EvaluationLoop']
 
 # %% ../nbs/05_utils.ipynb 3
+import copy
+import json
 from dataclasses import dataclass
+from pathlib import Path
+
+import gymnasium as gym
+import numpy as np
+
+from .dynamic_programming import perfect_foresight_rewards
 
 # %% ../nbs/05_utils.ipynb 4
 @dataclass
 class EvaluationData:
     episodes: list[int]
     rewards: list[float]
+    # the best reward of every episode knowing its scenario, see `perfect_foresight_rewards`
+    oracle_rewards: list[float] | None = None
+
+    @property
+    def regrets(self) -> list[float] | None:
+        """The oracle reward minus the reward of every episode."""
+        if self.oracle_rewards is None:
+            return None
+        return [
+            oracle - reward for oracle, reward in zip(self.oracle_rewards, self.rewards)
+        ]
+
+# %% ../nbs/05_utils.ipynb 5
+# the columns of an evaluation trace, with their dtypes
+TRACE_COLUMNS = {
+    "observations": np.float64,
+    "actions": np.int64,
+    "rewards": np.float64,
+    "n_valid_actions": np.int32,
+}
+# the steps buffered before they are appended to a trace, about two simulated years
+TRACE_CHUNK_SIZE = 4096
+
+
+class EpisodeTraceWriter:
+    """
+    Streams the steps of an evaluation episode into a `.npy` file per column.
+
+    The steps are buffered, and every `chunk_size` steps appended to the files, so an episode
+    only takes the space of the steps it played. `close` writes the number of steps into the
+    headers, which NumPy pads so that the length of an array can grow in place.
+    The trace store has a directory per agent and seed, with the files `<column>.npy`
+    and a `meta.json` with the number of steps, written by `close`.
+    """
+
+    def __init__(
+        self,
+        trace_dir: Path,
+        agent_name: str,
+        seed: int,
+        observation_shape: tuple[int, ...],
+        chunk_size: int = TRACE_CHUNK_SIZE,
+    ):
+        self._path = Path(trace_dir) / agent_name / str(seed)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._step_shapes = {"observations": tuple(observation_shape)}
+        self._buffers = {
+            column: np.empty(
+                (chunk_size, *self._step_shapes.get(column, ())), dtype=dtype
+            )
+            for column, dtype in TRACE_COLUMNS.items()
+        }
+        # the files of an earlier evaluation of the seed are replaced
+        for column in TRACE_COLUMNS:
+            self._write_header(column, "wb", 0)
+        self._chunk_size = chunk_size
+        self._n_steps = 0
+
+    def write(
+        self, observation: np.ndarray, action: int, reward: float, n_valid_actions: int
+    ) -> None:
+        step = self._n_steps % self._chunk_size
+        self._buffers["observations"][step] = observation
+        self._buffers["actions"][step] = action
+        self._buffers["rewards"][step] = reward
+        self._buffers["n_valid_actions"][step] = n_valid_actions
+        self._n_steps += 1
+        if step + 1 == self._chunk_size:
+            self._append_chunk(self._chunk_size)
+
+    def _write_header(self, column: str, mode: str, n_steps: int) -> None:
+        with open(self._path / f"{column}.npy", mode) as file:
+            np.lib.format.write_array_header_1_0(
+                file,
+                {
+                    "descr": np.lib.format.dtype_to_descr(
+                        np.dtype(TRACE_COLUMNS[column])
+                    ),
+                    "fortran_order": False,
+                    "shape": (n_steps, *self._step_shapes.get(column, ())),
+                },
+            )
+
+    def _append_chunk(self, n_steps: int) -> None:
+        for column, buffer in self._buffers.items():
+            with open(self._path / f"{column}.npy", "ab") as file:
+                buffer[:n_steps].tofile(file)
+
+    def close(self) -> None:
+        self._append_chunk(self._n_steps % self._chunk_size)
+        for column in TRACE_COLUMNS:
+            self._write_header(column, "r+b", self._n_steps)
+        (self._path / "meta.json").write_text(json.dumps({"n_steps": self._n_steps}))
+
+
+def write_oracle_rewards(
+    trace_dir: Path, agent_name: str, seeds: list[int], oracle_rewards: list[float]
+) -> None:
+    """Adds the perfect foresight reward of every seed to the `meta.json` of its trace."""
+    for seed, oracle_reward in zip(seeds, oracle_rewards):
+        meta_path = Path(trace_dir) / agent_name / str(seed) / "meta.json"
+        meta = json.loads(meta_path.read_text())
+        meta_path.write_text(json.dumps({**meta, "oracle_reward": oracle_reward}))
+
+
+def load_traces(
+    trace_dir: Path,
+    agents: list[str] | None = None,
+    seeds: list[int] | None = None,
+    columns: list[str] | None = None,
+) -> dict[str, dict[int, dict[str, np.ndarray]]]:
+    """
+    Memory-map the requested columns of the requested agents and seeds of a trace store, all of them by default.
+    """
+    trace_dir = Path(trace_dir)
+    if agents is None:
+        agents = sorted(path.name for path in trace_dir.iterdir() if path.is_dir())
+    traces = {}
+    for agent in agents:
+        agent_seeds = seeds
+        if agent_seeds is None:
+            agent_seeds = sorted(
+                int(path.name) for path in (trace_dir / agent).iterdir()
+            )
+        traces[agent] = {
+            seed: {
+                column: np.load(
+                    trace_dir / agent / str(seed) / f"{column}.npy", mmap_mode="r"
+                )
+                for column in (columns or TRACE_COLUMNS)
+            }
+            for seed in agent_seeds
+        }
+    return traces
+
+
+def load_evaluation_data(
+    trace_dir: Path, agents: list[str] | None = None, seeds: list[int] | None = None
+) -> dict[str, EvaluationData]:
+    """
+    The `EvaluationData` of every agent of a trace store, reading only its rewards.
+
+    The oracle rewards are given if `write_oracle_rewards` wrote those of all the seeds.
+    """
+    traces = load_traces(trace_dir, agents, seeds, columns=["rewards"])
+    evaluation_data = {}
+    for agent, agent_traces in traces.items():
+        oracle_rewards = [
+            json.loads(
+                (Path(trace_dir) / agent / str(seed) / "meta.json").read_text()
+            ).get("oracle_reward")
+            for seed in agent_traces
+        ]
+        evaluation_data[agent] = EvaluationData(
+            episodes=list(range(len(agent_traces))),
+            rewards=[np.sum(trace["rewards"]) for trace in agent_traces.values()],
+            oracle_rewards=None if None in oracle_rewards else oracle_rewards,
+        )
+    return evaluation_data
+
+# %% ../nbs/05_utils.ipynb 6
+class EvaluationLoop:
+    """
+    Plays the evaluation episodes of an agent, the loop shared by `Agent` and `NumpyPolicyAgent`.
+
+    It needs no RL library, the agents set `name` and `env` and choose the actions with
+    `choose_action`, or `choose_actions` for a batch of environments.
+    """
+
+    name: str
+    env: gym.Env
+
+    def choose_action(self, obs):
+        raise NotImplementedError
+
+    def choose_actions(self, observations: np.ndarray, envs: list) -> np.ndarray:
+        """
+        Choose the actions of a batch of observations, each from its own env.
+        """
+        raise NotImplementedError
+
+    def _trace_writer(
+        self, env: gym.Env, seed: int, trace_dir: Path | None
+    ) -> EpisodeTraceWriter | None:
+        if trace_dir is None:
+            return None
+        return EpisodeTraceWriter(
+            trace_dir,
+            self.name,
+            seed,
+            observation_shape=env.observation_space.shape,
+        )
+
+    def _evaluate_seed(
+        self, seed: int, render: bool = False, trace_dir: Path | None = None
+    ) -> float:
+        obs, _ = self.env.reset(seed=seed)
+        trace_writer = self._trace_writer(self.env, seed, trace_dir)
+        episode_rewards = []
+        done = truncated = False
+
+        while not (done or truncated):
+            action = self.choose_action(obs)
+            if trace_writer is not None:
+                n_valid_actions = self.env.unwrapped.action_masks().sum()
+            next_obs, reward, done, truncated, _ = self.env.step(action)
+            episode_rewards.append(reward)
+            if trace_writer is not None:
+                trace_writer.write(obs, action, reward, n_valid_actions)
+            obs = next_obs
+
+        if trace_writer is not None:
+            trace_writer.close()
+        if render:
+            self.env.render()
+        return np.sum(episode_rewards)
+
+    def _evaluate_batched(
+        self,
+        seeds: list[int],
+        render: bool = False,
+        trace_dir: Path | None = None,
+        progress=None,
+    ) -> list:
+        """The seeds played together in copies of `env`, `progress.update` is called at the end of each."""
+        envs = [copy.deepcopy(self.env) for _ in seeds]
+        observations = [env.reset(seed=seed)[0] for env, seed in zip(envs, seeds)]
+        trace_writers = [
+            self._trace_writer(env, seed, trace_dir) for env, seed in zip(envs, seeds)
+        ]
+        episode_rewards = [[] for _ in seeds]
+        # indices of the seeds whose episode is still running
+        running = list(range(len(envs)))
+
+        while running:
+            actions = self.choose_actions(
+                np.stack([observations[i] for i in running]),
+                [envs[i] for i in running],
+            )
+            still_running = []
+            for i, action in zip(running, actions):
+                if trace_writers[i] is not None:
+                    n_valid_actions = envs[i].unwrapped.action_masks().sum()
+                    obs = observations[i]
+                observations[i], reward, done, truncated, _ = envs[i].step(action)
+                episode_rewards[i].append(reward)
+                if trace_writers[i] is not None:
+                    trace_writers[i].write(obs, action, reward, n_valid_actions)
+                if not (done or truncated):
+                    still_running.append(i)
+                    continue
+                if trace_writers[i] is not None:
+                    trace_writers[i].close()
+                if render:
+                    envs[i].render()
+                if progress is not None:
+                    progress.update()
+            running = still_running
+
+        return [np.sum(rewards) for rewards in episode_rewards]
+
+    def _evaluation_data(
+        self,
+        seeds: list[int],
+        all_rewards: list,
+        oracle: bool = True,
+        trace_dir: Path | None = None,
+    ) -> EvaluationData:
+        """The oracle rewards are also written into the trace store of `trace_dir`."""
+        oracle_rewards = None
+        if oracle:
+            oracle_rewards = perfect_foresight_rewards(
+                self.env.unwrapped._config, seeds
+            ).tolist()
+            if trace_dir is not None:
+                write_oracle_rewards(trace_dir, self.name, seeds, oracle_rewards)
+        return EvaluationData(
+            episodes=list(range(len(all_rewards))),
+            rewards=all_rewards,
+            oracle_rewards=oracle_rewards,
+        )
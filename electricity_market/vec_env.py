@@ -0,0 +1,169 @@
+"""This module provides a NumPy-batched vectorized version of the electricity"""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/01_vec_env.ipynb.
+
+# %% auto 0
+__all__ = ['ElectricityMarketVecEnv']
+
+# %% ../nbs/01_vec_env.ipynb 3
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import (
+    VecEnvIndices,
+    VecEnvObs,
+    VecEnvStepReturn,
+)
+
+from .battery_dynamics import BatteryDynamics
+from .env import ElectricityMarketEnv, EnvConfig, get_scenario
+
+# %% ../nbs/01_vec_env.ipynb 4
+class ElectricityMarketVecEnv(VecEnv):
+    """
+    `n_envs` copies of `ElectricityMarketEnv` simulated together, the battery state,
+    weather, price and demand of all environments are held as NumPy arrays and
+    advanced with array operations instead of a Python loop over environments.
+    Each environment holds a copy of its episode's scenario tables, an environment
+    reset with a given seed follows the same scenario as `ElectricityMarketEnv`.
+    """
+
+    def __init__(self, n_envs: int, env_config: EnvConfig | None = None):
+        if env_config is None:
+            env_config = EnvConfig()
+        self._config = env_config
+        self.render_mode = None
+        # the scalar environment defines the spaces and the normalization bounds
+        env = ElectricityMarketEnv(env_config)
+        super().__init__(n_envs, env.observation_space, env.action_space)
+        self._dynamics = BatteryDynamics(env)
+        self._actions = np.zeros(n_envs, dtype=np.int64)
+        # an independent generator per environment, like `ElectricityMarketEnv.np_random`
+        self._np_randoms = [np.random.default_rng() for _ in range(n_envs)]
+        self._env_indices = np.arange(n_envs)
+
+        self._timesteps = np.zeros(n_envs, dtype=np.int64)
+        self._state_of_charge = np.zeros(n_envs, dtype=np.float64)
+        self._battery_capacity = np.zeros(n_envs, dtype=np.float64)
+        scenario_shape = (n_envs, self._config.max_timestep + 2)
+        self._production_table = np.zeros(scenario_shape, dtype=np.float64)
+        self._sell_price_table = np.zeros(scenario_shape, dtype=np.float64)
+        self._demand_of_electricity_table = np.zeros(scenario_shape, dtype=np.float64)
+        self.reset()
+
+    def reset(self) -> VecEnvObs:
+        for env_idx, seed in enumerate(self._seeds):
+            self._reset_env(env_idx, seed)
+        self._reset_seeds()
+        self._reset_options()
+        self._update_market()
+        return self._get_obs()
+
+    def _reset_env(self, env_idx: int, seed: int | None = None) -> None:
+        if seed is not None:
+            self._np_randoms[env_idx] = np.random.default_rng(seed)
+        scenario = get_scenario(self._config, seed, self._np_randoms[env_idx])
+        self._production_table[env_idx] = scenario.production
+        self._sell_price_table[env_idx] = scenario.sell_price
+        self._demand_of_electricity_table[env_idx] = scenario.demand_of_electricity
+        self._timesteps[env_idx] = 0
+        self._state_of_charge[env_idx] = self._config.init_state_of_charge
+        self._battery_capacity[env_idx] = self._config.init_battery_capacity
+
+    def _update_market(self) -> None:
+        """Reads the production, sell price and demand of the current timesteps."""
+        current = (self._env_indices, self._timesteps)
+        self._production = self._production_table[current]
+        self._sell_price = self._sell_price_table[current]
+        self._demand_of_electricity = self._demand_of_electricity_table[current]
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        charge_amounts = self._dynamics.charge_amounts(
+            self._actions, self._demand_of_electricity
+        )
+        truncated = self._timesteps >= self._config.max_timestep
+        dones = self._dynamics.is_done(self._battery_capacity) | truncated
+        rewards = self._dynamics.step(
+            self._state_of_charge,
+            self._battery_capacity,
+            charge_amounts,
+            self._production,
+            self._sell_price,
+        )
+
+        self._timesteps += 1
+        self._update_market()
+        observations = self._get_obs()
+
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for env_idx in np.flatnonzero(dones):
+                # a copy, the row is overwritten by the observation of the reset below
+                infos[env_idx]["terminal_observation"] = observations[env_idx].copy()
+                self._reset_env(env_idx)
+            self._update_market()
+            observations[dones] = self._get_obs()[dones]
+        return observations, rewards, dones, infos
+
+    def action_masks(self) -> np.ndarray:
+        """Generate a `(n_envs, n_actions)` boolean mask of valid actions for `MaskablePPO`."""
+        return self._dynamics.action_masks(
+            self._state_of_charge,
+            self._battery_capacity,
+            self._production,
+            self._demand_of_electricity,
+        )
+
+    def _get_obs(self) -> np.ndarray:
+        return self._dynamics.observations(
+            self._state_of_charge,
+            self._battery_capacity,
+            self._production,
+            self._demand_of_electricity,
+            self._sell_price,
+        )
+
+    def close(self) -> None:
+        pass
+
+    def _check_all_indices(self, indices: VecEnvIndices) -> None:
+        # attributes are shared by all environments, they can't be read or set per environment
+        if sorted(self._get_indices(indices)) != list(range(self.num_envs)):
+            raise ValueError(
+                f"attributes of {type(self).__name__} are shared by all environments, "
+                f"indices must be None or all of the environments, got {indices}"
+            )
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list:
+        self._check_all_indices(indices)
+        return [getattr(self, attr_name) for _ in range(self.num_envs)]
+
+    def set_attr(self, attr_name: str, value, indices: VecEnvIndices = None) -> None:
+        self._check_all_indices(indices)
+        setattr(self, attr_name, value)
+
+    def env_method(
+        self,
+        method_name: str,
+        *method_args,
+        indices: VecEnvIndices = None,
+        **method_kwargs,
+    ) -> list:
+        """
+        Call a batched method of the vectorized env and split its result per environment,
+        the method must return one result per environment, like `action_masks`.
+        """
+        results = getattr(self, method_name)(*method_args, **method_kwargs)
+        if np.ndim(results) == 0 or len(results) != self.num_envs:
+            raise TypeError(
+                f"{method_name} must return one result per environment "
+                f"({self.num_envs}), got {results!r}"
+            )
+        return [results[env_idx] for env_idx in self._get_indices(indices)]
+
+    def env_is_wrapped(
+        self, wrapper_class, indices: VecEnvIndices = None
+    ) -> list[bool]:
+        return [False for _ in self._get_indices(indices)]
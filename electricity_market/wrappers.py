@@ -0,0 +1,100 @@
+"""This module provides gymnasium wrappers reshaping the decisions of the electricity market environment."""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02_wrappers.ipynb.
+
+# %% auto 0
+__all__ = ['CompactActionWrapper', 'DecisionIntervalWrapper']
+
+# %% ../nbs/02_wrappers.ipynb 3
+import itertools
+
+import gymnasium as gym
+import numpy as np
+
+# %% ../nbs/02_wrappers.ipynb 4
+class CompactActionWrapper(gym.ActionWrapper):
+    """
+    Maps a compact action onto the interval of the currently valid actions of `ElectricityMarketEnv`.
+
+    With `n_bins`, an action is one of `n_bins` evenly spaced points of the interval, otherwise it
+    is the fraction of the interval in `[0, 1]`. The valid actions of `action_masks` are contiguous,
+    as the charge amount increases with the action, so every mapped action is valid and no action
+    masks are needed.
+    """
+
+    def __init__(self, env: gym.Env, n_bins: int | None = 21):
+        super().__init__(env)
+        if n_bins is None:
+            self.action_space = gym.spaces.Box(0.0, 1.0, shape=(1,), dtype=np.float32)
+        elif n_bins < 2:
+            raise ValueError(f"at least 2 bins are needed, got {n_bins}")
+        else:
+            self.action_space = gym.spaces.Discrete(n_bins)
+        self.n_bins = n_bins
+
+    def action(self, action) -> int:
+        low, high = self.valid_action_interval()
+        if self.n_bins is None:
+            fraction = float(np.clip(np.asarray(action).reshape(-1)[0], 0.0, 1.0))
+        else:
+            fraction = int(action) / (self.n_bins - 1)
+        return low + round(fraction * (high - low))
+
+    def valid_action_interval(self) -> tuple[int, int]:
+        """The lowest and highest actions of `action_masks`."""
+        valid_actions = np.flatnonzero(self.env.unwrapped.action_masks())
+        return int(valid_actions[0]), int(valid_actions[-1])
+
+# %% ../nbs/02_wrappers.ipynb 5
+class DecisionIntervalWrapper(gym.Wrapper):
+    """
+    Applies one decision over `interval` consecutive timesteps of the wrapped environment.
+
+    A decision repeats the same action at every timestep of the interval, or with `plan=True`,
+    it holds one action per timestep. The rewards of the interval are summed, and the interval
+    stops early when the episode ends. The `timesteps` info is the number of timesteps the
+    decision was applied over. The actions are interpreted by the wrapped environment at every
+    timestep, so wrapping a `CompactActionWrapper` keeps every action of the interval valid.
+    """
+
+    def __init__(self, env: gym.Env, interval: int = 6, plan: bool = False):
+        super().__init__(env)
+        if interval < 1:
+            raise ValueError(
+                f"the interval must be at least 1 timestep, got {interval}"
+            )
+        self.interval = interval
+        self.plan = plan
+        if plan:
+            self.action_space = self._plan_space(env.action_space, interval)
+
+    @staticmethod
+    def _plan_space(space: gym.Space, interval: int) -> gym.Space:
+        """The space of `interval` actions of `space`, one per timestep."""
+        if isinstance(space, gym.spaces.Discrete):
+            return gym.spaces.MultiDiscrete(
+                np.full(interval, space.n), start=np.full(interval, space.start)
+            )
+        if isinstance(space, gym.spaces.Box):
+            return gym.spaces.Box(
+                np.broadcast_to(space.low, (interval, *space.shape)),
+                np.broadcast_to(space.high, (interval, *space.shape)),
+                dtype=space.dtype,
+            )
+        raise ValueError(f"plans of {type(space).__name__} actions are not supported")
+
+    def step(self, action) -> tuple:
+        actions = action if self.plan else itertools.repeat(action, self.interval)
+        total_reward = 0.0
+        for timesteps, timestep_action in enumerate(actions, start=1):
+            observations, reward, done, truncated, info = self.env.step(timestep_action)
+            total_reward += reward
+            if done or truncated:
+                break
+        return (
+            observations,
+            total_reward,
+            done,
+            truncated,
+            {**info, "timesteps": timesteps},
+        )